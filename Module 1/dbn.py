@@ -0,0 +1,132 @@
+import numpy as np
+
+from inference import STATES, UNOBSERVED, _check_codes, default_network
+
+STREAM_VARIABLES = ('Human', 'Time')
+
+
+class RiskFilter:
+    """
+    Dynamic (two-slice) version of the Module 1 network, filtered per grid cell.
+
+    Hidden state per cell = Risk_t. Between ticks a cell keeps its risk level with
+    probability `persistence` and otherwise re-draws it from its static prior
+    P(Risk | Terrain, Hist, Hotspot of that cell):
+        P(R_t | R_t-1) = persistence * [R_t == R_t-1] + (1 - persistence) * prior_cell(R_t)
+    Human/Time readings are the emissions, with P(obs | R_t) taken from the static network.
+
+    The prediction step has the closed form b -> s^k b + (1 - s^k) prior after k silent
+    ticks, so it is applied lazily when a cell is next observed. A tick therefore only
+    touches the cells that reported something, never the whole reserve.
+    """
+
+    def __init__(self, static_evidence, n_cells=None, network=None, persistence=0.9, threshold=0.05):
+        self.network = network or default_network()
+        self.static = _check_codes(static_evidence, n_cells)
+        for var in STREAM_VARIABLES:
+            self.static.pop(var, None)
+        self.n_cells = len(next(iter(self.static.values()))) if self.static else n_cells
+        self.persistence = persistence
+        self.threshold = threshold
+        self._static_joint = self.network.joint_batch(self.static, self.n_cells)
+        self.prior = self._static_joint / self._static_joint.sum(axis=1, keepdims=True)
+        self.belief = self.prior.copy()
+        self.emitted = self.prior.copy()
+        self.last_tick = np.zeros(self.n_cells, dtype=np.int64)
+        self.tick = 0
+
+    def advance(self, steps=1):
+        self.tick += steps
+
+    def _predict(self, cells):
+        s = self.persistence ** (self.tick - self.last_tick[cells])[:, None]
+        return s * self.belief[cells] + (1 - s) * self.prior[cells]
+
+    def current(self, cells=None):
+        """Belief at the current tick, including the decay of cells not observed lately."""
+        cells = np.arange(self.n_cells) if cells is None else np.asarray(cells)
+        return self._predict(cells)
+
+    def update(self, cells, observations):
+        """
+        Forward step for the cells that reported at the current tick.
+
+        `observations` maps 'Human'/'Time' to integer codes aligned with `cells`
+        (UNOBSERVED allowed). Returns (cells, posteriors) for the cells whose posterior
+        moved by at least `threshold` since they were last emitted.
+        """
+        cells = np.asarray(cells, dtype=np.int64)
+        obs = _check_codes(observations, len(cells))
+        # a cell reported twice in one tick keeps its last reading
+        cells, first = np.unique(cells[::-1], return_index=True)
+        obs = {var: c[::-1][first] for var, c in obs.items()}
+
+        b = self._predict(cells)
+        evidence = {var: c[cells] for var, c in self.static.items()}
+        evidence.update(obs)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            likelihood = self.network.joint_batch(evidence, len(cells)) / self._static_joint[cells]
+        post = b * np.nan_to_num(likelihood)
+        z = post.sum(axis=1, keepdims=True)
+        post = np.where(z > 0, post / np.where(z > 0, z, 1), b)
+
+        self.belief[cells] = post
+        self.last_tick[cells] = self.tick
+        moved = np.abs(post - self.emitted[cells]).max(axis=1) >= self.threshold
+        self.emitted[cells[moved]] = post[moved]
+        return cells[moved], post[moved]
+
+    def filter_stream(self, records, step=1.0):
+        """
+        Generator over a time-ordered stream of (timestamp, cell, variable, value) records.
+
+        Timestamps are numbers or datetimes and are bucketed into ticks of `step` (seconds
+        for datetimes); values are state names or integer codes. Yields
+        (tick, cells, posteriors) for each tick in which some cell moved past the threshold.
+        """
+        start = self.tick
+        t0 = None
+        current = None
+        pending = {}
+        for ts, cell, var, value in records:
+            t = ts.timestamp() if hasattr(ts, 'timestamp') else float(ts)
+            if t0 is None:
+                t0 = t
+            tick = start + int((t - t0) // step)
+            if current is not None and tick != current:
+                if tick < current:
+                    raise ValueError(f"record at {ts!r} is older than tick {current}")
+                out = self._flush(current, pending)
+                if out is not None:
+                    yield out
+                pending = {}
+            current = tick
+            if var not in STREAM_VARIABLES:
+                raise ValueError(f"{var!r} is not a streamed variable; expected one of {STREAM_VARIABLES}")
+            code = STATES[var].index(value) if isinstance(value, str) else value
+            pending.setdefault(cell, {})[var] = code
+        if pending:
+            out = self._flush(current, pending)
+            if out is not None:
+                yield out
+
+    def _flush(self, tick, pending):
+        self.tick = tick
+        cells = np.fromiter(pending, dtype=np.int64, count=len(pending))
+        obs = {var: np.array([p.get(var, UNOBSERVED) for p in pending.values()], dtype=np.int64)
+               for var in STREAM_VARIABLES}
+        cells, post = self.update(cells, obs)
+        if len(cells):
+            return tick, cells, post
+        return None
+
+
+if __name__ == "__main__":
+    from inference import encode_evidence
+    static = {'Terrain': encode_evidence('Terrain', ['Dense', 'Riverbed', 'Open']),
+              'Hotspot': encode_evidence('Hotspot', ['Near', 'Far', 'Far'])}
+    rf = RiskFilter(static, threshold=0.02)
+    stream = [(0, 0, 'Time', 'Night'), (0, 0, 'Human', 'Present'), (1, 1, 'Human', 'Absent'),
+              (2, 0, 'Human', 'Present'), (5, 2, 'Time', 'Day')]
+    for tick, cells, post in rf.filter_stream(stream):
+        print(f"tick {tick}: cells {cells.tolist()} ->", np.round(post, 3).tolist())
@@ -0,0 +1,187 @@
+from itertools import product
+
+import numpy as np
+
+import main
+from main import terrain_states, time_states, hist_states, hm_states, hotspot_states, risk_states
+
+VARIABLES = ['Terrain', 'Time', 'Hist', 'Human', 'Hotspot', 'Risk']
+STATES = {'Terrain': terrain_states, 'Time': time_states, 'Hist': hist_states,
+          'Human': hm_states, 'Hotspot': hotspot_states, 'Risk': risk_states}
+AXIS = {var: i for i, var in enumerate(VARIABLES)}
+UNOBSERVED = -1
+
+
+def _risk_table(risk):
+    """Tabulate a risk CPT given either as a rule like risk_cpt or as an array indexed
+    [terrain, time, hist, hm, hotspot, risk]."""
+    if not callable(risk):
+        return np.asarray(risk, dtype=float)
+    table = np.empty([len(STATES[v]) for v in VARIABLES])
+    for idx in product(*(range(len(STATES[v])) for v in VARIABLES[:-1])):
+        args = [STATES[v][i] for v, i in zip(VARIABLES, idx)]
+        table[idx] = risk(*args)
+    return table
+
+
+class CompiledRiskNetwork:
+    """
+    The Module 1 Bayesian network compiled into NumPy factors:
+        P(Terrain) P(Time) P(Hist) P(Hotspot) P(Human | Time) P(Risk | Terrain, Time, Hist, Human, Hotspot)
+
+    The factors are multiplied into a single joint tensor (axes in VARIABLES order) once,
+    so a query only slices the observed axes and sums out the rest instead of
+    enumerating every assignment in Python. Any table left as None falls back to the
+    hand-written one in main.py.
+    """
+
+    def __init__(self, prior_terrain=None, prior_time=None, prior_hist=None, prior_hotspot=None,
+                 cpt_hm=None, risk_cpt=None):
+        self.prior_terrain = self._vector(prior_terrain, main.prior_terrain, terrain_states)
+        self.prior_time = self._vector(prior_time, main.prior_time, time_states)
+        self.prior_hist = self._vector(prior_hist, main.prior_hist, hist_states)
+        self.prior_hotspot = self._vector(prior_hotspot, main.prior_hotspot, hotspot_states)
+        hm = main.cpt_hm if cpt_hm is None else cpt_hm
+        if isinstance(hm, dict):
+            hm = [[hm[(t, h)] for h in hm_states] for t in time_states]
+        self.cpt_hm = np.asarray(hm, dtype=float)
+        self.risk = _risk_table(main.risk_cpt if risk_cpt is None else risk_cpt)
+        self.index = {var: {s: i for i, s in enumerate(STATES[var])} for var in VARIABLES}
+        self.joint = self.compile()
+        self._evidence_table = None
+
+    @staticmethod
+    def _vector(table, default, states):
+        table = default if table is None else table
+        if isinstance(table, dict):
+            table = [table[s] for s in states]
+        return np.asarray(table, dtype=float)
+
+    def compile(self):
+        # joint[t, ti, h, hm, hs, r] = P(t) P(ti) P(h) P(hm | ti) P(hs) P(r | t, ti, h, hm, hs)
+        return np.einsum('a,b,c,bd,e,abcdef->abcdef', self.prior_terrain, self.prior_time,
+                         self.prior_hist, self.cpt_hm, self.prior_hotspot, self.risk)
+
+    def posterior(self, evidence):
+        """P(Risk | evidence) for one evidence dict, same contract as main.posterior_risk."""
+        idx = [slice(None)] * len(VARIABLES)
+        for var, val in evidence.items():
+            i = self.index[var].get(val)
+            if i is None:
+                return None
+            idx[AXIS[var]] = slice(i, i + 1)
+        # keeping a length-1 Risk axis would collapse the posterior, so observed Risk is
+        # applied after summing out the parents instead
+        risk_idx = idx.pop()
+        sub = self.joint[tuple(idx)]
+        num = np.zeros(len(risk_states))
+        num[risk_idx] = sub.reshape(-1, len(risk_states)).sum(axis=0)[risk_idx]
+        denom = num.sum()
+        if denom == 0:
+            return None
+        return {r: float(num[i] / denom) for i, r in enumerate(risk_states)}
+
+    @property
+    def evidence_table(self):
+        """Unnormalised P(Risk, evidence) for every evidence pattern of the five parents.
+
+        Each parent axis gets one extra trailing slot holding the joint summed over that
+        variable, so index len(states) along an axis means "unobserved". The table has
+        4*3*4*3*3 rows of three risk values and is built once per network.
+        """
+        if self._evidence_table is None:
+            table = self.joint
+            for axis in range(len(VARIABLES) - 1):
+                table = np.concatenate([table, table.sum(axis=axis, keepdims=True)], axis=axis)
+            self._evidence_table = table
+        return self._evidence_table
+
+    def joint_batch(self, evidence, n=None):
+        """Unnormalised P(Risk, evidence) for N cells given columnar integer-coded evidence.
+
+        `evidence` maps variable names to length-N integer arrays of state indices (positions
+        in terrain_states, time_states, ...), with UNOBSERVED marking missing values.
+        Variables that are absent from the dict are unobserved in every cell.
+        """
+        codes = _check_codes(evidence, n)
+        num = self.evidence_table[tuple(self.evidence_index(codes, n))]
+        if 'Risk' in codes:
+            r = codes['Risk']
+            keep = (r == UNOBSERVED)[:, None] | (r[:, None] == np.arange(len(risk_states)))
+            num = np.where(keep, num, 0.0)
+        return num
+
+    def evidence_index(self, codes, n=None):
+        """Per-parent index arrays into evidence_table for already-checked codes."""
+        n = len(next(iter(codes.values()))) if codes else (n or 0)
+        idx = []
+        for var in VARIABLES[:-1]:
+            k = len(STATES[var])
+            c = codes.get(var)
+            idx.append(np.full(n, k) if c is None else np.where(c == UNOBSERVED, k, c))
+        return idx
+
+    def posterior_batch(self, evidence, n=None):
+        """P(Risk | evidence) for every cell as an (N, 3) array ordered like risk_states.
+
+        Rows whose evidence has zero probability come back as NaN, the batch equivalent of
+        posterior_risk returning None.
+        """
+        num = self.joint_batch(evidence, n)
+        denom = num.sum(axis=1, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(denom > 0, num / denom, np.nan)
+
+
+def encode_evidence(var, values):
+    """Integer-code an array of state names for `var`; None becomes UNOBSERVED."""
+    values = np.asarray(values, dtype=object)
+    codes = np.full(values.shape, UNOBSERVED, dtype=np.int64)
+    known = values == None  # noqa: E711 - elementwise comparison on an object array
+    for i, s in enumerate(STATES[var]):
+        hit = values == s
+        codes[hit] = i
+        known |= hit
+    if not known.all():
+        bad = values[~known][0]
+        raise ValueError(f"unknown {var} state {bad!r}; expected one of {STATES[var]}")
+    return codes
+
+
+def _check_codes(evidence, n=None):
+    codes = {}
+    for var, c in evidence.items():
+        if var not in STATES:
+            raise KeyError(var)
+        c = np.asarray(c, dtype=np.int64).ravel()
+        if n is not None and len(c) != n:
+            raise ValueError(f"{var} has {len(c)} cells, expected {n}")
+        n = len(c)
+        if ((c < UNOBSERVED) | (c >= len(STATES[var]))).any():
+            raise ValueError(f"{var} codes must lie in [{UNOBSERVED}, {len(STATES[var]) - 1}]")
+        codes[var] = c
+    return codes
+
+
+_default_network = None
+
+
+def default_network():
+    global _default_network
+    if _default_network is None:
+        _default_network = CompiledRiskNetwork()
+    return _default_network
+
+
+def posterior_risk(evidence):
+    """Drop-in replacement for main.posterior_risk backed by the compiled network."""
+    return default_network().posterior(evidence)
+
+
+def posterior_batch(evidence, n=None):
+    return default_network().posterior_batch(evidence, n)
+
+
+if __name__ == "__main__":
+    evidence = {'Terrain':'Dense','Time':'Night','Hist':'Medium','Hotspot':'Near'}
+    print("P(PoachingRisk | evidence) =", posterior_risk(evidence))
@@ -0,0 +1,220 @@
+from itertools import combinations, product
+
+import numpy as np
+
+import main
+
+
+def _contract(factors, out_vars):
+    """Multiply (array, vars) factors and sum out everything not in out_vars, via einsum.
+
+    Variables are renumbered per call because einsum only accepts 52 axis labels.
+    """
+    local = {}
+    operands = []
+    for arr, vars_ in factors:
+        operands += [arr, [local.setdefault(v, len(local)) for v in vars_]]
+    out = [local.setdefault(v, len(local)) for v in out_vars]
+    return np.einsum(*operands, out, optimize=len(factors) > 2)
+
+
+class BayesNet:
+    """
+    Declarative Bayesian network: nodes with states, parents and a CPT.
+
+    A CPT can be given as
+      - {state: p} for a root node,
+      - {(parent_1, ..., parent_k, state): p} keyed by state names,
+      - a function of the parent states returning the distribution over the node's states
+        (like main.risk_cpt),
+      - an array indexed [parent_1, ..., parent_k, state].
+    The junction tree is compiled on first query and reused until the structure changes.
+    """
+
+    def __init__(self, spec=None):
+        self.nodes = {}
+        self._tree = None
+        for name, node in (spec or {}).items():
+            self.add_node(name, node['states'], node.get('parents', ()), node['cpt'])
+
+    def add_node(self, name, states, parents, cpt):
+        parents = tuple(parents)
+        for p in parents:
+            if p not in self.nodes:
+                raise ValueError(f"parent {p!r} of {name!r} must be declared before it")
+        shape = [len(self.nodes[p]['states']) for p in parents] + [len(states)]
+        table = self._tabulate(cpt, states, parents, shape)
+        if not np.allclose(table.sum(axis=-1), 1.0):
+            raise ValueError(f"CPT rows of {name!r} do not sum to 1")
+        self.nodes[name] = {'states': list(states), 'parents': parents, 'cpt': table}
+        self._tree = None
+        return self
+
+    def _tabulate(self, cpt, states, parents, shape):
+        if isinstance(cpt, dict):
+            table = np.empty(shape)
+            parent_states = [self.nodes[p]['states'] for p in parents]
+            for idx in product(*(range(k) for k in shape)):
+                vals = [ps[i] for ps, i in zip(parent_states, idx)] + [states[idx[-1]]]
+                table[idx] = cpt[vals[0]] if not parents else cpt[tuple(vals)]
+            return table
+        if callable(cpt):
+            table = np.empty(shape)
+            parent_states = [self.nodes[p]['states'] for p in parents]
+            for idx in product(*(range(k) for k in shape[:-1])):
+                table[idx] = cpt(*(ps[i] for ps, i in zip(parent_states, idx)))
+            return table
+        table = np.asarray(cpt, dtype=float)
+        if table.shape != tuple(shape):
+            raise ValueError(f"CPT has shape {table.shape}, expected {tuple(shape)}")
+        return table
+
+    @property
+    def junction_tree(self):
+        if self._tree is None:
+            self._tree = JunctionTree(self)
+        return self._tree
+
+    def query(self, var, evidence=None):
+        """P(var | evidence) as {state: p}, or None if the evidence has zero probability."""
+        return self.junction_tree.query(var, evidence or {})
+
+
+class JunctionTree:
+    """
+    Clique tree compiled from a BayesNet: moralise, triangulate with a greedy min-fill
+    elimination order, keep the maximal cliques, and join them by a maximum-weight
+    spanning tree over separator sizes. Each CPT is multiplied into one clique covering
+    its family. A query enters evidence and runs one collect pass towards a clique
+    holding the query variable, so its cost is bounded by the largest clique (treewidth),
+    not by the size of the full joint.
+    """
+
+    def __init__(self, net):
+        self.net = net
+        self.card = {v: len(n['states']) for v, n in net.nodes.items()}
+        self.cliques = self._triangulate(self._moralise())
+        self.edges = self._spanning_tree()
+        self.potentials = self._assign_cpts()
+        self.home = {v: min((i for i, c in enumerate(self.cliques) if v in c), key=lambda i: len(self.cliques[i]))
+                     for v in net.nodes}
+
+    def _moralise(self):
+        adj = {v: set() for v in self.net.nodes}
+        for v, node in self.net.nodes.items():
+            family = node['parents'] + (v,)
+            for a, b in combinations(family, 2):
+                adj[a].add(b)
+                adj[b].add(a)
+        return adj
+
+    def _triangulate(self, adj):
+        adj = {v: set(n) for v, n in adj.items()}
+        cliques = []
+        while adj:
+            def fill(v):
+                return sum(1 for a, b in combinations(adj[v], 2) if b not in adj[a])
+
+            def weight(v):
+                return int(np.prod([self.card[u] for u in adj[v] | {v}]))
+            v = min(adj, key=lambda u: (fill(u), weight(u)))
+            clique = frozenset(adj[v] | {v})
+            if not any(clique <= c for c in cliques):
+                cliques.append(clique)
+            for a, b in combinations(adj[v], 2):
+                adj[a].add(b)
+                adj[b].add(a)
+            for u in adj[v]:
+                adj[u].discard(v)
+            del adj[v]
+        # an earlier clique may be swallowed by a later one
+        return [tuple(sorted(c)) for c in cliques if not any(c < d for d in cliques)]
+
+    def _spanning_tree(self):
+        # Kruskal on -|separator|; empty separators join disconnected components
+        parent = list(range(len(self.cliques)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+        pairs = sorted(combinations(range(len(self.cliques)), 2),
+                       key=lambda p: -len(set(self.cliques[p[0]]) & set(self.cliques[p[1]])))
+        edges = {i: [] for i in range(len(self.cliques))}
+        for i, j in pairs:
+            ri, rj = find(i), find(j)
+            if ri != rj:
+                parent[ri] = rj
+                edges[i].append(j)
+                edges[j].append(i)
+        return edges
+
+    def _assign_cpts(self):
+        potentials = [np.ones([self.card[v] for v in c]) for c in self.cliques]
+        for v, node in self.net.nodes.items():
+            family = node['parents'] + (v,)
+            i = min((i for i, c in enumerate(self.cliques) if set(family) <= set(c)),
+                    key=lambda i: len(self.cliques[i]))
+            potentials[i] = _contract([(potentials[i], self.cliques[i]), (node['cpt'], family)], self.cliques[i])
+        return potentials
+
+    def _evidence_factors(self, evidence):
+        factors = {i: [] for i in range(len(self.cliques))}
+        for var, val in evidence.items():
+            states = self.net.nodes[var]['states']
+            mask = np.zeros(len(states))
+            if val in states:
+                mask[states.index(val)] = 1.0
+            factors[self.home[var]].append((mask, (var,)))
+        return factors
+
+    def _collect(self, root, evidence):
+        """Factors left at `root` after passing messages inward from every leaf."""
+        factors = {i: [(self.potentials[i], self.cliques[i])] + extra
+                   for i, extra in self._evidence_factors(evidence).items()}
+        order, parent = [root], {root: None}
+        for i in order:
+            for j in self.edges[i]:
+                if j not in parent:
+                    parent[j] = i
+                    order.append(j)
+        for i in reversed(order[1:]):
+            sep = tuple(v for v in self.cliques[i] if v in self.cliques[parent[i]])
+            factors[parent[i]].append((_contract(factors[i], sep), sep))
+        return factors[root]
+
+    def query(self, var, evidence):
+        factors = self._collect(self.home[var], evidence)
+        num = _contract(factors, (var,))
+        denom = num.sum()
+        if denom == 0:
+            return None
+        return {s: float(p / denom) for s, p in zip(self.net.nodes[var]['states'], num)}
+
+
+def risk_network_spec():
+    """The six-variable network of main.py written as a declarative spec."""
+    return {
+        'Terrain': {'states': main.terrain_states, 'cpt': main.prior_terrain},
+        'Time': {'states': main.time_states, 'cpt': main.prior_time},
+        'Hist': {'states': main.hist_states, 'cpt': main.prior_hist},
+        'Hotspot': {'states': main.hotspot_states, 'cpt': main.prior_hotspot},
+        'Human': {'states': main.hm_states, 'parents': ['Time'], 'cpt': main.cpt_hm},
+        'Risk': {'states': main.risk_states, 'parents': ['Terrain', 'Time', 'Hist', 'Human', 'Hotspot'],
+                 'cpt': main.risk_cpt},
+    }
+
+
+if __name__ == "__main__":
+    net = BayesNet(risk_network_spec())
+    evidence = {'Terrain':'Dense','Time':'Night','Hist':'Medium','Hotspot':'Near'}
+    print("P(PoachingRisk | evidence) =", net.query('Risk', evidence))
+
+    # extending the network only needs new spec entries
+    net.add_node('Moon', ['Full', 'New'], [], {'Full': 0.5, 'New': 0.5})
+    net.add_node('Vehicle', ['Seen', 'NotSeen'], ['Risk', 'Moon'],
+                 lambda risk, moon: {'High': [0.6, 0.4], 'Medium': [0.3, 0.7], 'Low': [0.05, 0.95]}[risk]
+                 if moon == 'New' else {'High': [0.3, 0.7], 'Medium': [0.15, 0.85], 'Low': [0.02, 0.98]}[risk])
+    print("with vehicle sighting          =", net.query('Risk', dict(evidence, Vehicle='Seen')))
+    print("cliques:", net.junction_tree.cliques)
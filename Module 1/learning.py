@@ -0,0 +1,139 @@
+import csv
+
+import numpy as np
+
+from inference import STATES, UNOBSERVED, VARIABLES, CompiledRiskNetwork, encode_evidence
+
+# family of each CPT: (child, parents); counts are kept as arrays shaped [parents..., child]
+FAMILIES = {
+    'prior_terrain': ('Terrain', ()),
+    'prior_time': ('Time', ()),
+    'prior_hist': ('Hist', ()),
+    'prior_hotspot': ('Hotspot', ()),
+    'cpt_hm': ('Human', ('Time',)),
+    'risk_cpt': ('Risk', ('Terrain', 'Time', 'Hist', 'Human', 'Hotspot')),
+}
+
+
+class CPTCounter:
+    """
+    Sufficient statistics for the Module 1 CPTs, accumulated chunk by chunk.
+
+    Each chunk is columnar integer-coded evidence (see inference.encode_evidence) with
+    UNOBSERVED for missing fields. A family is counted only on the rows where the child
+    and all of its parents are observed, by encoding each row's tuple into one flat index
+    and calling np.bincount, so nothing per row runs in Python.
+    """
+
+    def __init__(self):
+        self.counts = {name: np.zeros([len(STATES[v]) for v in parents + (child,)])
+                       for name, (child, parents) in FAMILIES.items()}
+        self.rows = 0
+
+    def add(self, chunk):
+        n = len(next(iter(chunk.values())))
+        chunk = {var: np.asarray(c, dtype=np.int64) for var, c in chunk.items()}
+        for name, (child, parents) in FAMILIES.items():
+            family = parents + (child,)
+            if any(v not in chunk for v in family):
+                continue
+            cols = [chunk[v] for v in family]
+            complete = np.logical_and.reduce([c != UNOBSERVED for c in cols])
+            if not complete.any():
+                continue
+            shape = self.counts[name].shape
+            flat = np.ravel_multi_index([c[complete] for c in cols], shape)
+            self.counts[name] += np.bincount(flat, minlength=int(np.prod(shape))).reshape(shape)
+        self.rows += n
+        return self
+
+    def fit(self, alpha=1.0):
+        """MAP tables under a symmetric Dirichlet(alpha) prior (alpha=0 is plain MLE).
+
+        Parent configurations never seen with alpha=0 fall back to a uniform row.
+        """
+        tables = {}
+        for name, counts in self.counts.items():
+            smoothed = counts + alpha
+            total = smoothed.sum(axis=-1, keepdims=True)
+            k = counts.shape[-1]
+            tables[name] = np.where(total > 0, smoothed / np.where(total > 0, total, 1), 1.0 / k)
+        return tables
+
+
+def to_main_format(tables):
+    """Fitted arrays in the dict layout used by main.py (prior_* dicts, cpt_hm keyed by (time, hm))."""
+    out = {name: {s: float(p) for s, p in zip(STATES[child], tables[name])}
+           for name, (child, parents) in FAMILIES.items() if not parents}
+    out['cpt_hm'] = {(ti, hm): float(tables['cpt_hm'][i, j])
+                     for i, ti in enumerate(STATES['Time']) for j, hm in enumerate(STATES['Human'])}
+    out['risk_cpt'] = tables['risk_cpt']
+    return out
+
+
+def fitted_network(tables):
+    """CompiledRiskNetwork built from fitted tables, ready for posterior/posterior_batch."""
+    return CompiledRiskNetwork(**tables)
+
+
+def iter_csv_chunks(path, chunk_rows=100_000, columns=None):
+    """
+    Stream a CSV incident/patrol log as encoded chunks without loading it whole.
+
+    `columns` maps network variables to CSV headers (defaults to the variable names).
+    Empty cells are treated as unobserved; columns that are absent are skipped.
+    """
+    columns = columns or {v: v for v in VARIABLES}
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        pos = {var: header.index(col) for var, col in columns.items() if col in header}
+        while True:
+            rows = [row for _, row in zip(range(chunk_rows), reader)]
+            if not rows:
+                return
+            yield {var: encode_evidence(var, [row[i] or None for row in rows]) for var, i in pos.items()}
+
+
+def iter_parquet_chunks(path, chunk_rows=100_000, columns=None):
+    """Same as iter_csv_chunks for Parquet logs, read batch by batch (needs pyarrow)."""
+    import pyarrow.parquet as pq
+    columns = columns or {v: v for v in VARIABLES}
+    pf = pq.ParquetFile(path)
+    wanted = [c for c in columns.values() if c in pf.schema_arrow.names]
+    for batch in pf.iter_batches(batch_size=chunk_rows, columns=wanted):
+        data = batch.to_pydict()
+        yield {var: encode_evidence(var, data[col]) for var, col in columns.items() if col in data}
+
+
+def iter_npy_chunks(arrays, chunk_rows=1_000_000):
+    """
+    Chunks over already-encoded logs stored as one .npy file per variable.
+
+    `arrays` maps variables to .npy paths (opened with mmap_mode='r') or arrays, so a
+    multi-GB history is paged in chunk by chunk rather than read into RAM.
+    """
+    cols = {var: np.load(a, mmap_mode='r') if isinstance(a, str) else a for var, a in arrays.items()}
+    n = len(next(iter(cols.values())))
+    for start in range(0, n, chunk_rows):
+        yield {var: np.asarray(c[start:start + chunk_rows]) for var, c in cols.items()}
+
+
+def fit_cpts(chunks, alpha=1.0):
+    counter = CPTCounter()
+    for chunk in chunks:
+        counter.add(chunk)
+    return counter.fit(alpha)
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 2:
+        sys.exit("usage: python learning.py incidents.csv [alpha]")
+    alpha = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    tables = fit_cpts(iter_csv_chunks(sys.argv[1]), alpha)
+    fitted = to_main_format(tables)
+    for name in ('prior_terrain', 'prior_time', 'prior_hist', 'prior_hotspot', 'cpt_hm'):
+        print(name, '=', {k: round(v, 3) for k, v in fitted[name].items()})
+    evidence = {'Terrain':'Dense','Time':'Night','Hist':'Medium','Hotspot':'Near'}
+    print("P(PoachingRisk | evidence) =", fitted_network(tables).posterior(evidence))
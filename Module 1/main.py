@@ -48,6 +48,7 @@ def posterior_risk(evidence):
     if denom==0: return None
     return {r: num[r]/denom for r in risk_states}
 
-evidence = {'Terrain':'Dense','Time':'Night','Hist':'Medium','Hotspot':'Near'}
-post = posterior_risk(evidence)
-print("P(PoachingRisk | evidence) =", post)
\ No newline at end of file
+if __name__ == "__main__":
+    evidence = {'Terrain':'Dense','Time':'Night','Hist':'Medium','Hotspot':'Near'}
+    post = posterior_risk(evidence)
+    print("P(PoachingRisk | evidence) =", post)
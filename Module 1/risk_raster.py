@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+
+from inference import STATES, VARIABLES, default_network
+
+DEFAULT_RASTER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Module 2', 'risk_raster.npy')
+
+
+def export_risk_raster(evidence, shape, path=DEFAULT_RASTER, network=None, state='High', tile_rows=256):
+    """
+    Evaluate P(Risk=state | evidence) on every routing-grid cell and write it as a
+    float32 (rows, cols) .npy raster.
+
+    `evidence` maps variables to integer-coded arrays of the grid shape (UNOBSERVED = -1);
+    they may themselves be memory-mapped. Rows are processed in tiles straight into an
+    np.lib.format.open_memmap file, so neither the evidence nor the raster has to fit in
+    RAM. Cells with impossible evidence get the unconditioned probability. The file is
+    written beside the target and renamed into place, so a reader opening it with
+    np.load(path, mmap_mode='r') never sees a half-written raster.
+    """
+    net = network or default_network()
+    rows, cols = shape
+    col = STATES['Risk'].index(state)
+    fallback = net.posterior_batch({}, 1)[0, col]
+    tmp = f"{path}.tmp.npy"
+    raster = np.lib.format.open_memmap(tmp, mode='w+', dtype=np.float32, shape=(rows, cols))
+    for r0 in range(0, rows, tile_rows):
+        r1 = min(r0 + tile_rows, rows)
+        tile = {var: np.asarray(c[r0:r1]).ravel() for var, c in evidence.items()}
+        post = net.posterior_batch(tile, (r1 - r0) * cols)[:, col]
+        raster[r0:r1] = np.where(np.isnan(post), fallback, post).reshape(r1 - r0, cols)
+    raster.flush()
+    del raster
+    os.replace(tmp, path)
+    return path
+
+
+def load_evidence_dir(directory):
+    """Per-variable evidence grids saved as <Variable>.npy (e.g. Terrain.npy), memory-mapped."""
+    evidence = {}
+    for var in VARIABLES[:-1]:
+        p = os.path.join(directory, f"{var}.npy")
+        if os.path.exists(p):
+            evidence[var] = np.load(p, mmap_mode='r')
+    return evidence
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Write the Module 1 risk posterior as a raster for Module 2 routing.")
+    ap.add_argument('--evidence', help="directory holding <Variable>.npy integer-coded grids")
+    ap.add_argument('--shape', type=int, nargs=2, default=(5, 5), metavar=('ROWS', 'COLS'))
+    ap.add_argument('--out', default=DEFAULT_RASTER)
+    args = ap.parse_args()
+    evidence = load_evidence_dir(args.evidence) if args.evidence else {}
+    shape = next(iter(evidence.values())).shape if evidence else tuple(args.shape)
+    out = export_risk_raster(evidence, shape, os.path.normpath(args.out))
+    print(f"Risk raster {shape} written to {out}")
@@ -0,0 +1,147 @@
+import numpy as np
+
+from junction_tree import BayesNet, risk_network_spec
+
+
+def _evidence_codes(net, evidence):
+    codes = {}
+    for var, val in evidence.items():
+        states = net.nodes[var]['states']
+        if val not in states:
+            raise ValueError(f"unknown {var} state {val!r}; expected one of {states}")
+        codes[var] = states.index(val)
+    return codes
+
+
+def _draw(rng, probs):
+    """One categorical draw per row of an (N, k) probability array."""
+    u = rng.random(len(probs))[:, None] * probs.sum(axis=1, keepdims=True)
+    return np.minimum((probs.cumsum(axis=1) < u).sum(axis=1), probs.shape[1] - 1)
+
+
+def _cpt_rows(net, var, codes, n):
+    node = net.nodes[var]
+    if not node['parents']:
+        return np.broadcast_to(node['cpt'], (n, len(node['states'])))
+    return node['cpt'][tuple(codes[p] for p in node['parents'])]
+
+
+def _summary(net, query, p, se, ess, n):
+    states = net.nodes[query]['states']
+    return {'posterior': {s: float(x) for s, x in zip(states, p)},
+            'stderr': {s: float(x) for s, x in zip(states, se)},
+            'ess': float(ess), 'samples': int(n)}
+
+
+def likelihood_weighting(net, query, evidence, batch_size=10_000, max_samples=1_000_000,
+                         target_se=None, seed=0):
+    """
+    Likelihood-weighted estimate of P(query | evidence), sampled in NumPy batches.
+
+    Non-evidence nodes are drawn in topological order for a whole batch at once and the
+    evidence nodes contribute their CPT entry to the weight. Sampling stops at
+    max_samples or as soon as every state's standard error is below target_se.
+    Returns {'posterior', 'stderr', 'ess', 'samples'}; stderr uses the delta-method
+    variance of the self-normalised estimator and ess = (sum w)^2 / sum w^2.
+    """
+    rng = np.random.default_rng(seed)
+    ev = _evidence_codes(net, evidence)
+    k = len(net.nodes[query]['states'])
+    sw = sw2 = 0.0
+    swj = np.zeros(k)
+    sw2j = np.zeros(k)
+    n = 0
+    while n < max_samples:
+        b = min(batch_size, max_samples - n)
+        codes, w = {}, np.ones(b)
+        for var in net.nodes:
+            rows = _cpt_rows(net, var, codes, b)
+            if var in ev:
+                codes[var] = np.full(b, ev[var])
+                w = w * rows[:, ev[var]]
+            else:
+                codes[var] = _draw(rng, rows)
+        q = codes[query]
+        sw += w.sum()
+        sw2 += (w * w).sum()
+        swj += np.bincount(q, weights=w, minlength=k)
+        sw2j += np.bincount(q, weights=w * w, minlength=k)
+        n += b
+        if sw == 0:
+            continue
+        p = swj / sw
+        se = np.sqrt(np.maximum(sw2j * (1 - 2 * p) + p * p * sw2, 0)) / sw
+        if target_se is not None and se.max() < target_se:
+            break
+    if sw == 0:
+        raise ValueError("every sample had zero weight; the evidence may be impossible")
+    return _summary(net, query, p, se, sw * sw / sw2, n)
+
+
+def gibbs(net, query, evidence, chains=1_000, burn_in=50, max_sweeps=2_000, check_every=25,
+          target_se=None, seed=0):
+    """
+    Gibbs estimate of P(query | evidence) with `chains` independent chains advanced together.
+
+    Each sweep resamples every non-evidence node in all chains from its Markov-blanket
+    conditional (own CPT times the CPTs of its children). Chains start from
+    likelihood-weighted samples so they begin in a state consistent with the evidence.
+    The standard error comes from the spread of the per-chain means, and ess is
+    p(1 - p) / stderr^2 at the least certain state.
+    """
+    rng = np.random.default_rng(seed)
+    ev = _evidence_codes(net, evidence)
+    children = {v: [c for c, node in net.nodes.items() if v in node['parents']] for v in net.nodes}
+    hidden = [v for v in net.nodes if v not in ev]
+    k = len(net.nodes[query]['states'])
+
+    codes, w = {}, np.ones(chains)
+    for var in net.nodes:
+        rows = _cpt_rows(net, var, codes, chains)
+        if var in ev:
+            codes[var] = np.full(chains, ev[var])
+            w = w * rows[:, ev[var]]
+        else:
+            codes[var] = _draw(rng, rows)
+    if w.sum() == 0:
+        raise ValueError("could not find a starting state consistent with the evidence")
+    start = rng.choice(chains, size=chains, p=w / w.sum())
+    codes = {var: c[start] for var, c in codes.items()}
+
+    counts = np.zeros((chains, k))
+    kept = 0
+    for sweep in range(burn_in + max_sweeps):
+        for var in hidden:
+            kv = len(net.nodes[var]['states'])
+            probs = np.empty((chains, kv))
+            for s in range(kv):
+                codes[var] = np.full(chains, s)
+                lik = _cpt_rows(net, var, codes, chains)[:, s].copy()
+                for c in children[var]:
+                    lik *= _cpt_rows(net, c, codes, chains)[np.arange(chains), codes[c]]
+                probs[:, s] = lik
+            codes[var] = _draw(rng, probs)
+        if sweep < burn_in:
+            continue
+        counts[np.arange(chains), codes[query]] += 1
+        kept += 1
+        if kept % check_every == 0 or sweep == burn_in + max_sweeps - 1:
+            means = counts / kept
+            p = means.mean(axis=0)
+            se = means.std(axis=0, ddof=1) / np.sqrt(chains)
+            if target_se is not None and se.max() < target_se:
+                break
+    worst = se.argmax()
+    ess = p[worst] * (1 - p[worst]) / se[worst] ** 2 if se[worst] > 0 else float(chains * kept)
+    return _summary(net, query, p, se, ess, chains * kept)
+
+
+if __name__ == "__main__":
+    from main import posterior_risk
+    net = BayesNet(risk_network_spec())
+    evidence = {'Terrain':'Dense','Time':'Night','Hist':'Medium','Hotspot':'Near'}
+    print("exact    :", posterior_risk(evidence))
+    for name, fn in (("weighting", likelihood_weighting), ("gibbs", gibbs)):
+        res = fn(net, 'Risk', evidence, target_se=0.002, seed=7)
+        print(f"{name:9s}:", {s: round(p, 4) for s, p in res['posterior'].items()},
+              "stderr", round(max(res['stderr'].values()), 4), "ess", round(res['ess']), "samples", res['samples'])
@@ -0,0 +1,76 @@
+import numpy as np
+
+from inference import STATES, UNOBSERVED, VARIABLES, _check_codes, default_network
+
+CANDIDATES = VARIABLES[:-1]
+
+
+def _entropy(p, axis=-1):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return -np.nansum(np.where(p > 0, p * np.log2(p), 0.0), axis=axis)
+
+
+def information_gain(evidence, n=None, network=None, candidates=CANDIDATES):
+    """
+    Expected reduction in the entropy of Risk (bits) from observing each candidate variable.
+
+    `evidence` is columnar integer-coded evidence as for posterior_batch. The result is an
+    (N, len(candidates)) array; a candidate that is already observed in a cell gains 0.
+    Every hypothetical observation of every candidate is answered by a single gather
+    from the compiled evidence table, so there is no per-cell or per-value query loop:
+        EIG(V) = H(Risk | e) - sum_v P(V=v | e) H(Risk | e, V=v)
+    """
+    net = network or default_network()
+    codes = _check_codes(evidence, n)
+    codes.pop('Risk', None)
+    idx = net.evidence_index(codes, n)
+    n = len(idx[0])
+
+    # column m of `hyp` is one (candidate, value) pair; each parent axis gets an (N, M) index
+    pairs = [(var, v) for var in candidates for v in range(len(STATES[var]))]
+    hyp = [np.repeat(i[:, None], len(pairs), axis=1) for i in idx]
+    for m, (var, v) in enumerate(pairs):
+        hyp[VARIABLES.index(var)][:, m] = v
+    joint = net.evidence_table[tuple(hyp)]                       # (N, M, 3) = P(Risk, e, V=v)
+
+    base = net.evidence_table[tuple(idx)]                        # (N, 3)   = P(Risk, e)
+    p_e = base.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        h_prior = _entropy(base / p_e[:, None])
+        p_v = joint.sum(axis=2) / p_e[:, None]                   # P(V=v | e)
+        h_post = _entropy(joint / joint.sum(axis=2, keepdims=True))
+
+    gain = np.zeros((n, len(candidates)))
+    start = 0
+    for j, var in enumerate(candidates):
+        k = len(STATES[var])
+        cols = slice(start, start + k)
+        expected = np.nansum(p_v[:, cols] * h_post[:, cols], axis=1)
+        gain[:, j] = h_prior - expected
+        start += k
+        if var in codes:
+            gain[codes[var] != UNOBSERVED, j] = 0.0
+    gain[p_e == 0] = np.nan
+    return np.maximum(gain, 0.0)
+
+
+def best_sensor(evidence, n=None, network=None, candidates=CANDIDATES):
+    """Name of the candidate with the largest expected information gain in each cell,
+    together with that gain. Cells where nothing is left to observe get None."""
+    gain = information_gain(evidence, n, network, candidates)
+    best = np.nanargmax(np.where(np.isnan(gain), -1.0, gain), axis=1)
+    value = gain[np.arange(len(gain)), best]
+    names = np.array(candidates, dtype=object)[best]
+    names[~(value > 0)] = None
+    return names, value
+
+
+if __name__ == "__main__":
+    from inference import encode_evidence
+    evidence = {'Terrain': encode_evidence('Terrain', ['Dense', 'Riverbed', None]),
+                'Time': encode_evidence('Time', ['Night', 'Day', 'Night']),
+                'Hotspot': encode_evidence('Hotspot', [None, 'Near', 'Far'])}
+    gain = information_gain(evidence)
+    print("expected information gain (bits):", CANDIDATES)
+    print(np.round(gain, 4))
+    print("deploy next:", best_sensor(evidence)[0].tolist())
@@ -0,0 +1,131 @@
+import argparse
+import csv
+import itertools
+import json
+import time
+
+import numpy as np
+
+from routing import (HEAT_COST, HIGH_RISK_DEFAULTS, MIGRATION_ZONE, SEASON_MULT, VISIBILITY, WEATHER_MULT,
+                     Conditions, GridGraph, node_id)
+from search import ManhattanHeuristic, WeightedGraph, astar, ucs
+
+FIELDS = ('time_of_day', 'weather', 'season', 'mode', 'alert_node', 'alert_heat')
+ALGORITHMS = {
+    'ucs': lambda graph, s, t: ucs(graph, s, t),
+    'astar': lambda graph, s, t: astar(graph, s, t, ManhattanHeuristic(graph)),
+}
+
+
+def all_scenarios(alert_node=12):
+    """Every combination of the notebook's prompt options for one alert node."""
+    return [Conditions(t, w, s, m, alert_node, h) for t, w, s, m, h in
+            itertools.product(VISIBILITY, WEATHER_MULT, SEASON_MULT, ('ranger', 'drone'), HEAT_COST)]
+
+
+def load_scenarios(path):
+    """
+    Condition tuples from a .json list of objects or a .csv with a header, using the
+    Conditions field names; missing fields take the notebook's prompt defaults.
+    """
+    if path.endswith('.json'):
+        with open(path) as f:
+            rows = json.load(f)
+    else:
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+    scenarios = []
+    for row in rows:
+        row = {k: v for k, v in row.items() if k in FIELDS and v not in (None, '')}
+        if 'alert_node' in row:
+            row['alert_node'] = node_id(row['alert_node'])
+        scenarios.append(Conditions(**row))
+    return scenarios
+
+
+def scale_node(node, size):
+    """A node id of the notebook's 5x5 grid moved to the same relative place on a size x size grid."""
+    r, c = divmod(node_id(node), 5)
+    return (r * (size - 1) // 4) * size + c * (size - 1) // 4
+
+
+def make_grid(size, seed):
+    """The notebook's own map for size 5, otherwise random terrain and density for `seed`,
+    with the migration zone and high-risk nodes moved to their relative places."""
+    if size == 5:
+        return GridGraph(5, 5)
+    rng = np.random.default_rng(seed)
+    n = size * size
+    return GridGraph(size, size, terrain=rng.integers(0, 4, n), density=rng.random(n),
+                     migration_zone=[scale_node(x, size) for x in MIGRATION_ZONE],
+                     high_risk=[scale_node(x, size) for x in HIGH_RISK_DEFAULTS])
+
+
+def run(scenarios, sizes=(5, 50, 200), seeds=(0,), algorithms=('ucs', 'astar'), start=0):
+    """
+    Route every scenario on a grid of each size and seed with each algorithm, from
+    `start` to the scenario's alert node (both given on the 5x5 grid, see scale_node).
+    The 5x5 grid is the notebook's map, so it runs once whatever the seeds. Each grid's
+    CSR lists are converted once and shared by every scenario's graph, and a graph is
+    only rebuilt when the conditions change. Returns one record per run; only the search
+    itself is timed.
+    """
+    records = []
+    for size in sizes:
+        for seed in (seeds[:1] if size == 5 else seeds):
+            grid = make_grid(size, seed)
+            graph = key = None
+            for cond in scenarios:
+                goal = scale_node(cond.alert_node, size)
+                cond_at = Conditions(cond.time_of_day, cond.weather, cond.season, cond.mode, goal, cond.alert_heat)
+                if cond_at != key:
+                    key, weights = cond_at, grid.edge_weights(cond_at)
+                    graph = WeightedGraph(grid, weights) if graph is None else graph.reweighted(weights)
+                for name in algorithms:
+                    res = ALGORITHMS[name](graph, scale_node(start, size), goal)
+                    records.append({'size': size, 'seed': seed, 'algorithm': name, **cond.__dict__,
+                                    'cost': res.cost, 'expanded': res.expanded, 'pushes': res.pushes,
+                                    'ms': res.seconds * 1e3})
+    return records
+
+
+def summarize(records):
+    """Latency percentiles, mean expansions and mean cost per grid size and algorithm."""
+    rows = []
+    for (size, name), group in itertools.groupby(sorted(records, key=lambda r: (r['size'], r['algorithm'])),
+                                                 key=lambda r: (r['size'], r['algorithm'])):
+        group = list(group)
+        ms = np.array([r['ms'] for r in group])
+        p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+        rows.append({'size': f"{size}x{size}", 'algorithm': name, 'runs': len(group),
+                     'p50_ms': p50, 'p90_ms': p90, 'p99_ms': p99, 'max_ms': ms.max(),
+                     'expanded': np.mean([r['expanded'] for r in group]),
+                     'cost': np.mean([r['cost'] for r in group if r['cost'] is not None])})
+    return rows
+
+
+def print_table(rows):
+    cols = ('size', 'algorithm', 'runs', 'p50_ms', 'p90_ms', 'p99_ms', 'max_ms', 'expanded', 'cost')
+    print("  ".join(f"{c:>10s}" for c in cols))
+    for r in rows:
+        print("  ".join(f"{r[c]:>10.2f}" if isinstance(r[c], float) else f"{r[c]:>10}" for c in cols))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Run Module 2 routing scenarios without input() prompts and benchmark them.")
+    ap.add_argument('--scenarios', help="scenario file (.csv or .json); default: every prompt combination")
+    ap.add_argument('--sizes', type=int, nargs='+', default=[5, 50, 200], help="grid side lengths, e.g. 5 200 2000")
+    ap.add_argument('--seeds', type=int, nargs='+', default=[0])
+    ap.add_argument('--algorithms', nargs='+', default=list(ALGORITHMS), choices=list(ALGORITHMS))
+    ap.add_argument('--out', help="write the per-run records to this CSV")
+    args = ap.parse_args()
+    scenarios = load_scenarios(args.scenarios) if args.scenarios else all_scenarios()
+    t0 = time.perf_counter()
+    records = run(scenarios, args.sizes, args.seeds, args.algorithms)
+    print_table(summarize(records))
+    print(f"{len(records)} runs in {time.perf_counter() - t0:.1f} s")
+    if args.out:
+        with open(args.out, 'w', newline='') as f:
+            w = csv.DictWriter(f, fieldnames=list(records[0]))
+            w.writeheader()
+            w.writerows(records)
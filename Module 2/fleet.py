@@ -0,0 +1,157 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from routing import node_id
+from search import LandmarkHeuristic, ManhattanHeuristic, WeightedGraph, astar
+
+_worker = {}
+
+
+class _SharedGrid:
+    """The parts of a GridGraph the searches read, rebuilt in a worker from shared arrays."""
+
+    def __init__(self, rows, cols, indptr, indices):
+        self.rows, self.cols = rows, cols
+        self.n = rows * cols
+        self.indptr, self.indices = indptr, indices
+
+
+def _view(a):
+    """Zero-copy memoryview of a 1-D int64 or float64 array. Indexing it gives plain Python
+    ints and floats, so the search loops run as fast as on lists."""
+    return memoryview(a).cast('B').cast('q' if a.dtype.kind == 'i' else 'd')
+
+
+class _SharedGraph:
+    """
+    WeightedGraph interface over shared-memory arrays. WeightedGraph copies its arrays
+    into Python lists, which in a worker would duplicate the whole graph per process;
+    here indptr, indices and weights stay memoryviews of the shared blocks.
+    """
+
+    def __init__(self, grid, weights):
+        self.grid = grid
+        self.n = grid.n
+        self.weights = weights
+        self.indptr, self.indices, self.w = _view(grid.indptr), _view(grid.indices), _view(weights)
+        self.min_weight = float(weights.min()) if len(weights) else 0.0
+
+
+def _share(arrays):
+    """Copy named arrays into shared memory blocks; returns the blocks and their specs."""
+    blocks, specs = [], {}
+    for name, a in arrays.items():
+        a = np.ascontiguousarray(a)
+        shm = shared_memory.SharedMemory(create=True, size=max(a.nbytes, 1))
+        np.ndarray(a.shape, a.dtype, buffer=shm.buf)[...] = a
+        blocks.append(shm)
+        specs[name] = (shm.name, a.shape, a.dtype.str)
+    return blocks, specs
+
+
+def _init_worker(rows, cols, specs, heuristic, landmark_ids):
+    arrays = {}
+    for name, (shm_name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _worker.setdefault('blocks', []).append(shm)
+        arrays[name] = np.ndarray(shape, dtype, buffer=shm.buf)
+    grid = _SharedGrid(rows, cols, arrays['indptr'], arrays['indices'])
+    graph = _SharedGraph(grid, arrays['weights'])
+    if heuristic == 'landmarks':
+        # the tables were computed once by the parent; each row is a view into shared memory
+        _worker['graph'] = graph
+        _worker['heuristic'] = LandmarkHeuristic.from_tables(graph, landmark_ids,
+                                                              [_view(row) for row in arrays['landmarks']])
+    else:
+        _install(graph, heuristic, 0)
+
+
+def _install(graph, heuristic, landmarks):
+    _worker['graph'] = graph
+    if heuristic == 'landmarks':
+        _worker['heuristic'] = LandmarkHeuristic(graph, landmarks)
+    elif heuristic == 'manhattan':
+        _worker['heuristic'] = ManhattanHeuristic(graph)
+    else:
+        _worker['heuristic'] = None
+
+
+def _route(query):
+    start, goal = query
+    return astar(_worker['graph'], start, goal, _worker['heuristic'])
+
+
+def _private_mb(_=None):
+    """(pid, memory private to this process in MB), not counting pages shared with other
+    processes such as the shared graph blocks; None for the memory off Linux."""
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+    except OSError:
+        return os.getpid(), None
+    return os.getpid(), sum(int(fields[k].split()[0]) for k in ('Private_Clean', 'Private_Dirty')) / 1024
+
+
+def route_fleet(grid, weights, queries, workers=None, heuristic='manhattan', landmarks=8, chunksize=None,
+                stats=None):
+    """
+    A* for every (start, goal) query of a fleet, spread over a process pool.
+
+    The CSR arrays and the edge weights are copied once into shared memory; workers
+    search memoryviews of them instead of receiving a pickled graph with every task or
+    building their own copy, so the graph is held once however many workers run and only
+    the query pairs and the results cross process boundaries. Results come back in query
+    order whatever the scheduling. heuristic is 'manhattan', 'landmarks' (the ALT tables
+    are computed once here and shared the same way) or None for UCS. With workers=1 the
+    queries run in this process. A `stats` dict, if given, receives the private memory
+    of each worker in MB under 'worker_mb'.
+    """
+    queries = [(node_id(s), node_id(g)) for s, g in queries]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(queries) < 2:
+        _install(WeightedGraph(grid, weights), heuristic, landmarks)
+        return [_route(q) for q in queries]
+    arrays = {'indptr': np.asarray(grid.indptr, dtype=np.int64), 'indices': np.asarray(grid.indices, dtype=np.int64),
+              'weights': np.asarray(weights, dtype=float)}
+    landmark_ids = []
+    if heuristic == 'landmarks':
+        lm = LandmarkHeuristic(WeightedGraph(grid, weights), landmarks)
+        landmark_ids, arrays['landmarks'] = lm.landmarks, np.array(lm.dist, dtype=float)
+    blocks, specs = _share(arrays)
+    try:
+        chunksize = chunksize or max(1, len(queries) // (4 * workers))
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(grid.rows, grid.cols, specs, heuristic, landmark_ids)) as pool:
+            results = list(pool.map(_route, queries, chunksize=chunksize))
+            if stats is not None:
+                stats['worker_mb'] = dict(pool.map(_private_mb, range(4 * workers)))
+            return results
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+if __name__ == "__main__":
+    from routing import Conditions, GridGraph
+    rng = np.random.default_rng(0)
+    grid = GridGraph(200, 200, terrain=rng.integers(0, 4, 200 * 200))
+    cond = Conditions(alert_node=grid.n // 2 + 100)
+    weights = grid.edge_weights(cond)
+    teams = rng.integers(0, grid.n, 64).tolist()
+    queries = [(t, cond.alert_node) for t in teams]
+    for w in (1, max(2, os.cpu_count() or 1)):
+        t0 = time.perf_counter()
+        stats = {}
+        res = route_fleet(grid, weights, queries, workers=w, stats=stats)
+        print(f"{w:2d} worker(s): {len(res)} routes in {time.perf_counter() - t0:.2f} s, "
+              f"first cost {res[0].cost:.3f}")
+        if stats.get('worker_mb'):
+            mb = [m for m in stats['worker_mb'].values() if m is not None]
+            graph_mb = (grid.indptr.nbytes + grid.indices.nbytes + weights.nbytes) / 2 ** 20
+            print(f"    private memory per worker: {min(mb):.1f}-{max(mb):.1f} MB "
+                  f"(shared graph: {graph_mb:.1f} MB, held once)")
@@ -0,0 +1,100 @@
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from routing import DRONE_DISCOUNT, DRONE_THRESHOLD, Conditions, node_id, uniform_scale
+from search import SearchResult, WeightedGraph, dijkstra_all
+
+
+class RouteCache:
+    """
+    Shortest-path trees from each base, cached under the factors that can change a route.
+
+    Visibility, weather and season scale every edge by the same amount, so for rangers
+    they cannot change which route is optimal and are left out of the key. The drone
+    discount applies only above a weight threshold, so for drones their product is part
+    of the key. Alert node, thermal level, mode and the base always are.
+    A hit walks the cached parent pointers and re-prices that path with the exact
+    (rounded) weights of the requested conditions; no search runs. Trees are computed
+    on unrounded weights, so in a near-tie at the 0.001 level the cached route may differ
+    from the notebook's UCS route. Its cost is still exact for the route returned.
+    The cache holds at most `max_entries` trees and evicts the least recently used.
+    """
+
+    def __init__(self, grid, density=None, max_entries=32):
+        self.grid = grid
+        self.density = density
+        self.max_entries = max_entries
+        self.trees = OrderedDict()
+        self.hits = self.misses = 0
+        self._weights = OrderedDict()
+
+    def key(self, cond, start):
+        scale = round(uniform_scale(cond), 12) if cond.mode == 'drone' else None
+        return (cond.mode, scale, node_id(cond.alert_node), cond.alert_heat, node_id(start))
+
+    def _tree(self, cond, start):
+        key = self.key(cond, start)
+        tree = self.trees.get(key)
+        if tree is not None:
+            self.trees.move_to_end(key)
+            self.hits += 1
+            return tree, True
+        self.misses += 1
+        scale, spatial = self.grid.factored_weights(cond, self.density)
+        if cond.mode == 'drone':
+            w = scale * spatial
+            spatial = np.where(w > DRONE_THRESHOLD, w * DRONE_DISCOUNT, w)
+        dist, parent = dijkstra_all(WeightedGraph(self.grid, spatial), node_id(start))
+        tree = (np.array(dist), np.array(parent, dtype=np.int64))
+        self.trees[key] = tree
+        if len(self.trees) > self.max_entries:
+            self.trees.popitem(last=False)
+        return tree, False
+
+    def weights(self, cond):
+        """Exact edge weights for `cond`, memoised for the most recent few conditions."""
+        w = self._weights.get(cond)
+        if w is None:
+            w = self._weights[cond] = self.grid.edge_weights(cond, self.density)
+            if len(self._weights) > 8:
+                self._weights.popitem(last=False)
+        return w
+
+    def route(self, cond, start, goal):
+        t0 = time.perf_counter()
+        (dist, parent), hit = self._tree(cond, start)
+        start, goal = node_id(start), node_id(goal)
+        if not np.isfinite(dist[goal]):
+            return SearchResult(None, None, 0, 0, time.perf_counter() - t0, {'hit': hit})
+        path = [goal]
+        while path[-1] != start:
+            path.append(int(parent[path[-1]]))
+        path.reverse()
+        w = self.weights(cond)
+        edges = _edge_ids(self.grid, path)
+        cost = float(sum(w[edges].tolist()))
+        expanded = 0 if hit else self.grid.n
+        return SearchResult(path, cost, expanded, 0, time.perf_counter() - t0, {'hit': hit})
+
+
+def _edge_ids(grid, path):
+    """CSR edge id of each consecutive (u, v) step of a path."""
+    u = np.asarray(path[:-1], dtype=np.int64)
+    v = np.asarray(path[1:], dtype=np.int64)
+    # at most four edges per node: scan the slots of each tail for its head
+    ids = np.full(len(u), -1, dtype=np.int64)
+    for k in range(4):
+        e = np.minimum(grid.indptr[u] + k, len(grid.indices) - 1)
+        ids = np.where((ids < 0) & (e < grid.indptr[u + 1]) & (grid.indices[e] == v), e, ids)
+    return ids
+
+
+if __name__ == "__main__":
+    from routing import GridGraph, node_name
+    cache = RouteCache(GridGraph(5, 5))
+    for cond in (Conditions(), Conditions(time_of_day='day', weather='clear'), Conditions(season='monsoon')):
+        res = cache.route(cond, 0, cond.alert_node)
+        print(f"{cond.time_of_day}/{cond.weather}/{cond.season}:", [node_name(u) for u in res.path],
+              round(res.cost, 3), "cache hit" if res.stats['hit'] else "searched")
@@ -0,0 +1,146 @@
+import os
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba
+
+from routing import node_id, node_name
+
+ROUTE_COLORS = ['orange', 'purple', 'cyan', 'magenta', 'lime']
+LABEL_LIMIT = 400
+DETAIL_LIMIT = 150
+
+
+def edge_cost_raster(grid, weights):
+    """
+    Edge costs as a (2*rows - 1, 2*cols - 1) image: the pixel between two node pixels
+    holds the cost of that edge, a node pixel the mean cost of its edges and the
+    diagonal pixels are NaN. Node (r, c) sits at pixel (2r, 2c).
+    """
+    w = np.asarray(weights, dtype=float)
+    img = np.full((2 * grid.rows - 1, 2 * grid.cols - 1), np.nan)
+    (r1, c1), (r2, c2) = grid.position(grid.src), grid.position(grid.indices)
+    img[r1 + r2, c1 + c2] = w
+    deg = np.diff(grid.indptr)
+    mean = np.bincount(grid.src, w, minlength=grid.n) / np.maximum(deg, 1)
+    img[0::2, 0::2] = mean.reshape(grid.rows, grid.cols)
+    return img
+
+
+def _route_xy(grid, path):
+    r, c = grid.position(np.array([node_id(u) for u in path]))
+    return c, r
+
+
+def draw_routes(ax, grid, weights, routes, alert_node=None, labels=None):
+    """
+    Draw the grid and overlay every route of `routes` ({title: path}) on one axes.
+
+    Small grids are drawn like the notebook's draw(): edges as a single LineCollection,
+    nodes as one scatter, with weight and node labels. Above LABEL_LIMIT edges the labels
+    are dropped, and above that many nodes the edges become the edge_cost_raster heatmap
+    (per-node means beyond DETAIL_LIMIT rows or columns), so the number of artists stays
+    constant whatever the grid size. Routes are drawn narrower in turn so overlapping
+    ones stay visible. `labels` forces labelling on or off.
+    """
+    w = np.asarray(weights, dtype=float)
+    if grid.n <= LABEL_LIMIT:
+        und = np.flatnonzero(grid.src < grid.indices)
+        (r1, c1), (r2, c2) = grid.position(grid.src[und]), grid.position(grid.indices[und])
+        segs = np.stack([np.stack([c1, r1], -1), np.stack([c2, r2], -1)], 1)
+        ax.add_collection(LineCollection(segs, colors='gray', linewidths=1, zorder=1))
+        r, c = grid.position(np.arange(grid.n))
+        ax.scatter(c, r, s=70, color='green', zorder=2)
+        if labels if labels is not None else len(und) <= LABEL_LIMIT:
+            for x, y, wt in zip((c1 + c2) / 2, (r1 + r2) / 2, w[und]):
+                ax.text(x, y, str(wt), fontsize=8, color='blue')
+            for u in range(grid.n):
+                ax.text(c[u], r[u] + 0.1, node_name(u), fontsize=9)
+    else:
+        raster = edge_cost_raster(grid, w)
+        if max(grid.rows, grid.cols) <= DETAIL_LIMIT:
+            extent = (-0.25, grid.cols - 0.75, grid.rows - 0.75, -0.25)
+        else:
+            # more cells than screen pixels: one pixel per node (mean cost of its edges)
+            raster, extent = raster[0::2, 0::2], (-0.5, grid.cols - 0.5, grid.rows - 0.5, -0.5)
+        img = ax.imshow(raster, cmap='viridis', interpolation='nearest', extent=extent)
+        ax.figure.colorbar(img, ax=ax, fraction=0.046, label='edge cost')
+    if alert_node is not None:
+        ar, ac = grid.position(node_id(alert_node))
+        ax.scatter(ac, ar, s=200, facecolors='none', edgecolors='red', linewidth=2, zorder=4)
+    for k, ((title, path), color) in enumerate(zip(routes.items(), ROUTE_COLORS * len(routes))):
+        if path:
+            x, y = _route_xy(grid, path)
+            ax.plot(x, y, color=color, linewidth=6 / (k + 1), label=title, zorder=3)
+    if routes:
+        ax.legend(loc='upper right', fontsize=8)
+    ax.set_xlim(-0.5, grid.cols - 0.5)
+    ax.set_ylim(grid.rows - 0.5, -0.5)
+    ax.set_aspect('equal')
+    return ax
+
+
+def render(grid, weights, routes, alert_node=None, title='', path=None, size=7, dpi=100):
+    """One figure with every route overlaid; saved to `path` if given, else shown."""
+    fig, ax = plt.subplots(figsize=(size, size))
+    draw_routes(ax, grid, weights, routes, alert_node)
+    ax.set_title(title)
+    if path:
+        fig.savefig(path, dpi=dpi, bbox_inches='tight')
+        plt.close(fig)
+    else:
+        plt.show()
+    return path
+
+
+def export_tiles(grid, weights, routes, out_dir, tile=256, px=2, cmap='viridis'):
+    """
+    Write the edge-cost heatmap with the routes burned in as PNG tiles for a map viewer:
+    `{out_dir}/{tile_row}_{tile_col}.png`, each covering tile x tile raster pixels scaled
+    up by `px`. Tiles are colour-mapped straight from the array with plt.imsave, no figure
+    is built and only one tile is colour-mapped at a time. Returns the tile grid shape.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    img = edge_cost_raster(grid, weights)
+    lo, hi = np.nanmin(img), np.nanmax(img)
+    colormap = plt.get_cmap(cmap)
+    # node pixels and the edge pixels between consecutive nodes of every route
+    burn = []
+    for (title, path), color in zip(routes.items(), ROUTE_COLORS * len(routes)):
+        if path:
+            x, y = _route_xy(grid, path)
+            burn.append((np.concatenate([2 * y, y[:-1] + y[1:]]), np.concatenate([2 * x, x[:-1] + x[1:]]),
+                         to_rgba(color)))
+    th, tw = -(-img.shape[0] // tile), -(-img.shape[1] // tile)
+    for i in range(th):
+        for j in range(tw):
+            block = img[i * tile:(i + 1) * tile, j * tile:(j + 1) * tile]
+            rgba = colormap((block - lo) / max(hi - lo, 1e-12))
+            rgba[np.isnan(block)] = 0
+            for ys, xs, color in burn:
+                ys, xs = ys - i * tile, xs - j * tile
+                inside = (ys >= 0) & (ys < block.shape[0]) & (xs >= 0) & (xs < block.shape[1])
+                rgba[ys[inside], xs[inside]] = color
+            rgba = np.repeat(np.repeat(rgba, px, 0), px, 1)
+            plt.imsave(os.path.join(out_dir, f"{i}_{j}.png"), rgba)
+    return th, tw
+
+
+if __name__ == "__main__":
+    import time
+
+    from routing import Conditions, GridGraph
+    from search import ManhattanHeuristic, WeightedGraph, astar, ucs
+    for size in (5, 400):
+        rng = np.random.default_rng(0)
+        grid = GridGraph(size, size, terrain=None if size == 5 else rng.integers(0, 4, size * size))
+        cond = Conditions(alert_node=12 if size == 5 else grid.n // 2 + size // 2)
+        w = grid.edge_weights(cond)
+        graph = WeightedGraph(grid, w)
+        u = ucs(graph, 0, cond.alert_node)
+        a = astar(graph, 0, cond.alert_node, ManhattanHeuristic(graph))
+        t0 = time.perf_counter()
+        render(grid, w, {f"UCS (expanded {u.expanded})": u.path, f"A* (expanded {a.expanded})": a.path},
+               cond.alert_node, f"{size}x{size} routes, cost {u.cost:.3f}", path=f"routes_{size}.png")
+        print(f"{size}x{size}: rendered in {time.perf_counter() - t0:.2f} s -> routes_{size}.png")
@@ -0,0 +1,229 @@
+import heapq
+import time
+
+import numpy as np
+
+from routing import DRONE_DISCOUNT, DRONE_THRESHOLD, Conditions, node_id
+from search import INF, ManhattanHeuristic, SearchResult, WeightedGraph, landmarks_for
+
+
+def _key_less(a, b):
+    """Lexicographic key order that treats first components equal up to float noise, so a
+    path-cost tie is still broken by the second component as the algorithm requires."""
+    tol = 1e-9 * max(1.0, abs(b[0])) if b[0] != INF else 0.0
+    if a[0] < b[0] - tol:
+        return True
+    return abs(a[0] - b[0]) <= tol and a[1] < b[1]
+
+
+class DStarLite:
+    """
+    D* Lite (Koenig & Likhachev) from a moving ranger to a fixed alert node.
+
+    The search is rooted at the goal, so when edge weights change only the vertices whose
+    cost-to-goal is affected are re-expanded, and moving the ranger just shifts the key
+    modifier km. Edge weights are symmetric, so predecessors and successors share the
+    grid adjacency.
+
+    `heuristic` (anything with .toward(node), e.g. a LandmarkHeuristic) must stay a
+    consistent lower bound under every later update. Without one, the grid distance
+    scaled by the cheapest edge is used, and the search restarts from scratch if an
+    update makes some edge cheaper than that.
+    """
+
+    def __init__(self, graph, start, goal, heuristic=None):
+        self.graph = graph
+        self.start, self.goal = start, goal
+        self.fixed_heuristic = heuristic
+        self.expanded = 0
+        self._reset()
+
+    def _reset(self):
+        self.heuristic = self.fixed_heuristic or ManhattanHeuristic(self.graph)
+        self.h = self.heuristic.toward(self.start)
+        self.g = {}
+        self.rhs = {self.goal: 0.0}
+        self.km = 0.0
+        self.queued = {}
+        self.pq = []
+        self._push(self.goal)
+
+    def key(self, s):
+        m = min(self.g.get(s, INF), self.rhs.get(s, INF))
+        return (m + self.h(s) + self.km, m)
+
+    def _push(self, s):
+        k = self.key(s)
+        self.queued[s] = k
+        heapq.heappush(self.pq, (k, s))
+
+    def _top(self):
+        while self.pq:
+            k, s = self.pq[0]
+            if self.queued.get(s) == k:
+                return k, s
+            heapq.heappop(self.pq)
+        return (INF, INF), None
+
+    def _update_vertex(self, s):
+        if self.g.get(s, INF) != self.rhs.get(s, INF):
+            self._push(s)
+        else:
+            self.queued.pop(s, None)
+
+    def _best_rhs(self, s):
+        ip, idx, w, g = self.graph.indptr, self.graph.indices, self.graph.w, self.g
+        return min((w[e] + g.get(idx[e], INF) for e in range(ip[s], ip[s + 1])), default=INF)
+
+    def compute(self):
+        ip, idx, w = self.graph.indptr, self.graph.indices, self.graph.w
+        g, rhs = self.g, self.rhs
+        while True:
+            k_old, u = self._top()
+            start_key = self.key(self.start)
+            if u is None or (not _key_less(k_old, start_key) and rhs.get(self.start, INF) == g.get(self.start, INF)):
+                return
+            k_new = self.key(u)
+            if k_old < k_new:
+                self._push(u)
+                continue
+            self.expanded += 1
+            gu, ru = g.get(u, INF), rhs.get(u, INF)
+            if gu > ru:
+                g[u] = ru
+                self.queued.pop(u, None)
+                for e in range(ip[u], ip[u + 1]):
+                    s = idx[e]
+                    if s != self.goal and w[e] + ru < rhs.get(s, INF):
+                        rhs[s] = w[e] + ru
+                        self._update_vertex(s)
+            else:
+                g[u] = INF
+                for e in range(ip[u], ip[u + 1]):
+                    s = idx[e]
+                    if s != self.goal and rhs.get(s, INF) == w[e] + gu:
+                        rhs[s] = self._best_rhs(s)
+                    self._update_vertex(s)
+                if u != self.goal:
+                    rhs[u] = self._best_rhs(u)
+                self._update_vertex(u)
+
+    def path(self):
+        if self.g.get(self.start, INF) == INF:
+            return None, None
+        ip, idx, w, g = self.graph.indptr, self.graph.indices, self.graph.w, self.g
+        path, cost, u = [self.start], 0.0, self.start
+        while u != self.goal:
+            e = min(range(ip[u], ip[u + 1]), key=lambda e: w[e] + g.get(idx[e], INF))
+            cost += w[e]
+            u = idx[e]
+            path.append(u)
+            if len(path) > self.graph.n:
+                return None, None
+        return path, cost
+
+    def plan(self):
+        t0 = time.perf_counter()
+        before = self.expanded
+        self.compute()
+        path, cost = self.path()
+        return SearchResult(path, cost, self.expanded - before, 0, time.perf_counter() - t0)
+
+    def move_to(self, node):
+        """The ranger has advanced to `node`; later plans start from there."""
+        self.km += self.h(node)
+        self.start = node
+        self.h = self.heuristic.toward(node)
+
+    def update_edges(self, edges, weights):
+        """Apply new weights to edge ids (both directions of a changed road should be given)."""
+        edges = np.asarray(edges, dtype=np.int64)
+        weights = np.asarray(weights, dtype=float)
+        changed = self.graph.weights[edges] != weights
+        edges, weights = edges[changed], weights[changed]
+        self.graph.set_weights(edges, weights)
+        if self.fixed_heuristic is None and len(weights) and weights.min() < self.heuristic.scale:
+            self._reset()
+            return
+        for u in np.unique(self.graph.grid.src[edges]).tolist():
+            if u != self.goal:
+                self.rhs[u] = self._best_rhs(u)
+                self._update_vertex(u)
+
+
+def heat_lower_bound_weights(grid, cond, density=None):
+    """
+    Edge weights that no thermal reading can undercut: heat multipliers are >= the 'low'
+    level, and in drone mode the discount can at worst bring an edge down to
+    DRONE_THRESHOLD * DRONE_DISCOUNT. Landmarks built on these stay admissible whatever
+    the alert node or heat.
+    """
+    w = grid.edge_weights(Conditions(cond.time_of_day, cond.weather, cond.season, cond.mode,
+                                     cond.alert_node, 'low'), density)
+    if cond.mode == 'drone':
+        w = np.minimum(w, DRONE_THRESHOLD * DRONE_DISCOUNT)
+    return w
+
+
+class Replanner:
+    """
+    Incremental version of the notebook's compute_graph() + ucs() loop for one ranger.
+
+    A new thermal reading only changes the heat of the alert node and its neighbours, so
+    only the edges touching those nodes are re-weighted and handed to D* Lite. A relocated
+    alert changes the goal D* Lite is rooted at, so it starts a fresh search, but still
+    re-weights only the edges around the old and new alert. The ALT heuristic is built
+    once per time/weather/season/mode on heat_lower_bound_weights, so it stays valid
+    through every heat change.
+    """
+
+    def __init__(self, grid, cond=Conditions(), start=0, density=None, landmarks=8):
+        self.grid = grid
+        self.cond = cond
+        self.density = density
+        self.graph = WeightedGraph(grid, grid.edge_weights(cond, density))
+        self.heuristic = None
+        if landmarks:
+            key = ('heat-lower-bound', cond.time_of_day, cond.weather, cond.season, cond.mode,
+                   None if density is None else hash(np.asarray(density).tobytes()))
+            bound = WeightedGraph(grid, heat_lower_bound_weights(grid, cond, density))
+            self.heuristic = landmarks_for(key, bound, landmarks)
+        self.dstar = DStarLite(self.graph, node_id(start), node_id(cond.alert_node), self.heuristic)
+
+    def _touching(self, nodes):
+        nodes = np.unique(nodes)
+        out = np.concatenate([np.arange(self.grid.indptr[u], self.grid.indptr[u + 1]) for u in nodes])
+        return np.unique(np.concatenate([out, self.grid.reverse[out]]))
+
+    def update_alert(self, alert_heat=None, alert_node=None):
+        old = node_id(self.cond.alert_node)
+        new = old if alert_node is None else node_id(alert_node)
+        heat = self.cond.alert_heat if alert_heat is None else alert_heat
+        self.cond = Conditions(self.cond.time_of_day, self.cond.weather, self.cond.season,
+                               self.cond.mode, new, heat)
+        nodes = np.concatenate([[old, new], self.grid.neighbors(old), self.grid.neighbors(new)])
+        edges = self._touching(nodes)
+        weights = self.grid.edge_weights(self.cond, self.density, edges)
+        if new != old:
+            self.graph.set_weights(edges, weights)
+            self.dstar = DStarLite(self.graph, self.dstar.start, new, self.heuristic)
+        else:
+            self.dstar.update_edges(edges, weights)
+        return self.plan()
+
+    def move_to(self, node):
+        self.dstar.move_to(node_id(node))
+
+    def plan(self):
+        return self.dstar.plan()
+
+
+if __name__ == "__main__":
+    from routing import GridGraph, node_name
+    grid = GridGraph(5, 5)
+    rp = Replanner(grid, Conditions(alert_heat='low'))
+    res = rp.plan()
+    print("initial :", [node_name(u) for u in res.path], round(res.cost, 3), "expanded", res.expanded)
+    rp.move_to(res.path[1])
+    res = rp.update_alert(alert_heat='high')
+    print("heat up :", [node_name(u) for u in res.path], round(res.cost, 3), "expanded", res.expanded)
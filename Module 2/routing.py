@@ -0,0 +1,198 @@
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+# weight model of module2.ipynb, kept under the notebook's names
+TERRAIN_PENALTY = {'flat': 0, 'rocky': 2, 'forest': 3, 'river': 4}
+HEAT_COST = {'low': 1.0, 'medium': 1.3, 'high': 1.6}
+VISIBILITY = {'day': 0.9, 'night': 1.3}
+WEATHER_MULT = {'clear': 1.0, 'foggy': 1.2, 'rainy': 1.4}
+SEASON_MULT = {'dry': 1.2, 'monsoon': 1.5, 'winter': 1.0}
+MIGRATION_MULT = 1.4
+HIGH_RISK_MULT = 1.5
+DRONE_THRESHOLD = 3
+DRONE_DISCOUNT = 0.7
+DEFAULT_DENSITY = 0.2
+
+TERRAIN_TYPES = list(TERRAIN_PENALTY)
+MIGRATION_ZONE = [6, 7, 8]
+HIGH_RISK_DEFAULTS = [12, 18]
+
+
+@dataclass(frozen=True)
+class Conditions:
+    """One scenario of the notebook's input() prompts; the defaults are the prompt defaults."""
+    time_of_day: str = 'night'
+    weather: str = 'foggy'
+    season: str = 'dry'
+    mode: str = 'ranger'
+    alert_node: int = 12
+    alert_heat: str = 'high'
+
+
+def uniform_scale(cond):
+    """Product of the multipliers that are the same on every edge (visibility, weather, season)."""
+    return VISIBILITY[cond.time_of_day] * WEATHER_MULT[cond.weather] * SEASON_MULT[cond.season]
+
+
+def node_id(name):
+    """'N12' -> 12; integers pass through."""
+    return int(name[1:]) if isinstance(name, str) else int(name)
+
+
+def node_name(i):
+    return f"N{i}"
+
+
+class GridGraph:
+    """
+    4-connected patrol grid stored as CSR arrays with integer node ids (r * cols + c).
+
+    indptr/indices follow the notebook's neighbour order (up, down, left, right), `src`
+    holds the tail of every edge and `reverse[e]` the id of the opposite edge, so the
+    whole weight model is evaluated with NumPy over all edges at once.
+    """
+
+    def __init__(self, rows, cols, terrain=None, density=None, migration_zone=None,
+                 high_risk=None, base_weight=1.0):
+        self.rows, self.cols = rows, cols
+        self.n = rows * cols
+        self._build_edges()
+        self.base = np.full(len(self.indices), float(base_weight))
+        self.terrain = np.zeros(self.n, dtype=np.int8) if terrain is None else self._terrain_codes(terrain)
+        self.density = np.full(self.n, DEFAULT_DENSITY) if density is None else np.asarray(density, float).reshape(-1)
+        self.migration = self._mask(migration_zone, MIGRATION_ZONE)
+        self.high_risk = self._mask(high_risk, HIGH_RISK_DEFAULTS)
+
+    def _build_edges(self):
+        r, c = np.divmod(np.arange(self.n), self.cols)
+        src, dst = [], []
+        for dr, dc, ok in ((-1, 0, r > 0), (1, 0, r < self.rows - 1),
+                           (0, -1, c > 0), (0, 1, c < self.cols - 1)):
+            u = np.flatnonzero(ok)
+            src.append(u)
+            dst.append(u + dr * self.cols + dc)
+        src, dst = np.concatenate(src), np.concatenate(dst)
+        order = np.argsort(src, kind='stable')
+        self.src = src[order].astype(np.int64)
+        self.indices = dst[order].astype(np.int64)
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(self.src, minlength=self.n))]).astype(np.int64)
+        # within a node the edges are in direction order, not by target, so sort the keys first
+        key = self.src * self.n + self.indices
+        by_key = np.argsort(key)
+        self.reverse = by_key[np.searchsorted(key[by_key], self.indices * self.n + self.src)].astype(np.int64)
+
+    def _terrain_codes(self, terrain):
+        terrain = np.asarray(terrain).reshape(-1)
+        if terrain.dtype.kind in 'iu':
+            return terrain.astype(np.int8)
+        return np.array([TERRAIN_TYPES.index(t) for t in terrain], dtype=np.int8)
+
+    def _mask(self, nodes, defaults):
+        """Boolean node mask. Without `nodes` the notebook's 5x5 defaults are used, keeping
+        only the ones that exist on this grid; nodes given explicitly must all exist."""
+        if nodes is None:
+            ids = [u for u in map(node_id, defaults) if u < self.n]
+        else:
+            ids = [node_id(x) for x in nodes]
+            bad = [u for u in ids if not 0 <= u < self.n]
+            if bad:
+                raise ValueError(f"nodes {bad} are outside the {self.rows}x{self.cols} grid")
+        m = np.zeros(self.n, dtype=bool)
+        m[ids] = True
+        return m
+
+    def neighbors(self, u):
+        return self.indices[self.indptr[u]:self.indptr[u + 1]]
+
+    def position(self, u):
+        return divmod(u, self.cols)
+
+    def heat_costs(self, alert_node, alert_heat):
+        """Per-node heat multiplier: thermal level at the alert, one step weaker around it."""
+        heat = np.full(self.n, HEAT_COST['low'])
+        a = node_id(alert_node)
+        if alert_heat == 'high':
+            heat[a] = HEAT_COST['high']
+            heat[self.neighbors(a)] = HEAT_COST['medium']
+        elif alert_heat == 'medium':
+            heat[a] = HEAT_COST['medium']
+            heat[self.neighbors(a)] = HEAT_COST['low']
+        return heat
+
+    def edge_weights(self, cond=Conditions(), density=None, edges=None):
+        """
+        Weight of every edge (or only `edges`) under `cond`; a vectorised port of
+        compute_graph with the same multiplier order and the same rounding to 3 places.
+        """
+        u, v = (self.src, self.indices) if edges is None else (self.src[edges], self.indices[edges])
+        tp = np.array([TERRAIN_PENALTY[t] for t in TERRAIN_TYPES])[self.terrain]
+        heat = self.heat_costs(cond.alert_node, cond.alert_heat)
+        d = self.density if density is None else np.asarray(density, float).reshape(-1)
+
+        c = (self.base if edges is None else self.base[edges]) + (tp[u] + tp[v])
+        c = c * VISIBILITY[cond.time_of_day]
+        c = c * WEATHER_MULT[cond.weather]
+        c = c * (heat[u] * heat[v])
+        c = c * SEASON_MULT[cond.season]
+        c = c * ((1 + d[u]) * (1 + d[v]))
+        c = np.where(self.migration[u] | self.migration[v], c * MIGRATION_MULT, c)
+        c = np.where(self.high_risk[u] | self.high_risk[v], c * HIGH_RISK_MULT, c)
+        if cond.mode == 'drone':
+            c = np.where(c > DRONE_THRESHOLD, c * DRONE_DISCOUNT, c)
+        return round3(c)
+
+    def factored_weights(self, cond=Conditions(), density=None):
+        """
+        edge_weights split into its uniform part and its per-edge part: visibility,
+        weather and season multiply every edge alike, so they come back as one scalar
+        next to the spatial factor (terrain, heat, density, migration, high-risk).
+        scale * spatial equals edge_weights before the drone discount and rounding, up
+        to float rounding order.
+        """
+        u, v = self.src, self.indices
+        tp = np.array([TERRAIN_PENALTY[t] for t in TERRAIN_TYPES])[self.terrain]
+        heat = self.heat_costs(cond.alert_node, cond.alert_heat)
+        d = self.density if density is None else np.asarray(density, float).reshape(-1)
+        c = (self.base + (tp[u] + tp[v])) * (heat[u] * heat[v]) * ((1 + d[u]) * (1 + d[v]))
+        c = np.where(self.migration[u] | self.migration[v], c * MIGRATION_MULT, c)
+        c = np.where(self.high_risk[u] | self.high_risk[v], c * HIGH_RISK_MULT, c)
+        return uniform_scale(cond), c
+
+    def to_dict_graph(self, weights):
+        """The notebook's {"N0": {"N1": w, ...}} layout, for ucs/astar/draw in module2.ipynb."""
+        return {node_name(u): {node_name(int(v)): float(w) for v, w in
+                               zip(self.indices[self.indptr[u]:self.indptr[u + 1]],
+                                   weights[self.indptr[u]:self.indptr[u + 1]])}
+                for u in range(self.n)}
+
+
+def round3(c):
+    """round(x, 3) for every element, matching Python's correctly-rounded result.
+
+    np.round scales by 1000 first, which can land on the other side of a .0005 tie, so
+    the few elements that sit that close to a tie are redone with the builtin.
+    """
+    r = np.round(c, 3)
+    frac = np.abs(c * 1000 - np.floor(c * 1000) - 0.5)
+    for i in np.flatnonzero(frac < 1e-6):
+        r[i] = round(float(c[i]), 3)
+    return r
+
+
+def load_density(path='risk_raster.npy', shape=None):
+    """Per-node density from a Module 1 risk raster, memory-mapped (no copy) when it exists."""
+    if not os.path.exists(path):
+        return None
+    raster = np.load(path, mmap_mode='r')
+    if shape is not None and raster.shape != tuple(shape):
+        raise ValueError(f"risk raster is {raster.shape}, grid is {tuple(shape)}")
+    return raster.reshape(-1)
+
+
+if __name__ == "__main__":
+    grid = GridGraph(5, 5, density=load_density(shape=(5, 5)))
+    w = grid.edge_weights(Conditions())
+    print(f"{grid.rows}x{grid.cols} grid: {grid.n} nodes, {len(w)} directed edges")
+    print("N0 ->", grid.to_dict_graph(w)['N0'])
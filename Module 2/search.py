@@ -0,0 +1,372 @@
+import heapq
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+INF = float('inf')
+
+
+@dataclass
+class SearchResult:
+    """Path (integer node ids), cost and the counters the notebook prints for UCS/A*."""
+    path: Optional[List[int]]
+    cost: Optional[float]
+    expanded: int = 0
+    pushes: int = 0
+    seconds: float = 0.0
+    stats: dict = field(default_factory=dict)
+
+
+class WeightedGraph:
+    """
+    A GridGraph with one set of edge weights, held as plain Python lists so the search
+    loops index them without NumPy scalar overhead. Build it once per weight vector.
+    """
+
+    def __init__(self, grid, weights):
+        self.grid = grid
+        self.n = grid.n
+        self.weights = np.array(weights, dtype=float)
+        self.indptr = grid.indptr.tolist()
+        self.indices = grid.indices.tolist()
+        self.w = self.weights.tolist()
+        self.min_weight = float(self.weights.min()) if len(self.weights) else 0.0
+
+    def reweighted(self, weights):
+        """The same grid under another weight vector. The CSR lists are shared rather than
+        converted again; no search writes to them."""
+        graph = WeightedGraph.__new__(WeightedGraph)
+        graph.grid, graph.n, graph.indptr, graph.indices = self.grid, self.n, self.indptr, self.indices
+        graph.weights = np.array(weights, dtype=float)
+        graph.w = graph.weights.tolist()
+        graph.min_weight = float(graph.weights.min()) if len(graph.weights) else 0.0
+        return graph
+
+    def set_weights(self, edges, weights):
+        """Overwrite some edge weights in place. min_weight only ever decreases, so it stays
+        a valid lower bound for the heuristics."""
+        edges = np.asarray(edges, dtype=np.int64)
+        weights = np.asarray(weights, dtype=float)
+        for e, x in zip(edges.tolist(), weights.tolist()):
+            self.w[e] = x
+        self.weights[edges] = weights
+        if len(weights):
+            self.min_weight = min(self.min_weight, float(weights.min()))
+
+    def edges(self, u):
+        ip = self.indptr
+        return zip(self.indices[ip[u]:ip[u + 1]], self.w[ip[u]:ip[u + 1]])
+
+
+def _path(parent, start, goal):
+    path = [goal]
+    while path[-1] != start:
+        path.append(parent[path[-1]])
+    path.reverse()
+    return path
+
+
+class ManhattanHeuristic:
+    """Grid distance scaled by the cheapest edge, so it stays admissible for any conditions
+    (the notebook's unscaled Manhattan distance overestimates once edges drop below 1)."""
+
+    def __init__(self, graph):
+        self.cols = graph.grid.cols
+        self.scale = graph.min_weight
+
+    def toward(self, target):
+        tr, tc = divmod(target, self.cols)
+        cols, scale = self.cols, self.scale
+
+        def h(v):
+            r, c = divmod(v, cols)
+            return (abs(r - tr) + abs(c - tc)) * scale
+        return h
+
+
+class LandmarkHeuristic:
+    """
+    ALT lower bounds: with exact distances d(L, .) from a few landmarks L,
+    |d(L, t) - d(L, v)| <= d(v, t) by the triangle inequality (edge weights are symmetric).
+    Landmarks are picked by farthest-point selection; the Manhattan bound is folded in.
+    """
+
+    def __init__(self, graph, k=8, seed_node=0):
+        self.graph = graph
+        self.manhattan = ManhattanHeuristic(graph)
+        self.landmarks = []
+        self.dist = []
+        closest = np.full(graph.n, np.inf)
+        nxt = seed_node
+        for _ in range(min(k, graph.n)):
+            d = np.array(dijkstra_all(graph, nxt)[0])
+            self.landmarks.append(nxt)
+            self.dist.append(d.tolist())
+            closest = np.minimum(closest, d)
+            nxt = int(np.argmax(np.where(np.isfinite(closest), closest, -1)))
+
+    @classmethod
+    def from_tables(cls, graph, landmarks, dist):
+        """Wrap distance tables computed elsewhere (any rows indexable by node id) without
+        running the landmark searches again."""
+        lm = cls.__new__(cls)
+        lm.graph = graph
+        lm.manhattan = ManhattanHeuristic(graph)
+        lm.landmarks = list(landmarks)
+        lm.dist = list(dist)
+        return lm
+
+    def toward(self, target):
+        pairs = [(d, d[target]) for d in self.dist]
+        mh = self.manhattan.toward(target)
+
+        def h(v):
+            best = mh(v)
+            for d, dt in pairs:
+                x = d[v] - dt
+                if x < 0:
+                    x = -x
+                if x > best:
+                    best = x
+            return best
+        return h
+
+
+_landmark_cache = weakref.WeakKeyDictionary()
+
+
+def landmarks_for(key, graph, k=8, max_entries=16):
+    """
+    Landmark tables precomputed once per weight configuration `key` (e.g. a Conditions)
+    of a grid. Tables are cached per GridGraph, oldest configuration evicted first.
+    """
+    per_grid = _landmark_cache.setdefault(graph.grid, {})
+    lm = per_grid.get(key)
+    if lm is None:
+        if len(per_grid) >= max_entries:
+            per_grid.pop(next(iter(per_grid)))
+        lm = per_grid[key] = LandmarkHeuristic(graph, k)
+    return lm
+
+
+def dijkstra_all(graph, source):
+    """Exact distances and parents from `source` to every node."""
+    dist = [INF] * graph.n
+    parent = [-1] * graph.n
+    dist[source] = 0.0
+    pq = [(0.0, source)]
+    ip, idx, w = graph.indptr, graph.indices, graph.w
+    while pq:
+        d, u = heapq.heappop(pq)
+        if d > dist[u]:
+            continue
+        for e in range(ip[u], ip[u + 1]):
+            v = idx[e]
+            nd = d + w[e]
+            if nd < dist[v]:
+                dist[v] = nd
+                parent[v] = u
+                heapq.heappush(pq, (nd, v))
+    return dist, parent
+
+
+def dijkstra_until(graph, source, targets):
+    """Dijkstra from `source` that stops once every node in `targets` is settled."""
+    dist = {source: 0.0}
+    parent = {source: source}
+    closed = set()
+    remaining = set(targets)
+    pq = [(0.0, source)]
+    expanded = 0
+    ip, idx, w = graph.indptr, graph.indices, graph.w
+    while pq and remaining:
+        d, u = heapq.heappop(pq)
+        if u in closed:
+            continue
+        closed.add(u)
+        remaining.discard(u)
+        expanded += 1
+        for e in range(ip[u], ip[u + 1]):
+            v = idx[e]
+            nd = d + w[e]
+            if nd < dist.get(v, INF):
+                dist[v] = nd
+                parent[v] = u
+                heapq.heappush(pq, (nd, v))
+    return dist, parent, expanded
+
+
+class DistanceMatrix:
+    """
+    Cost of the cheapest route from every source to every target. Only the parent
+    pointers of each search are kept; path(i, j) rebuilds a route when it is asked for.
+    """
+
+    def __init__(self, sources, targets, costs, parents, transposed, expanded, seconds):
+        self.sources, self.targets = sources, targets
+        self.costs = costs
+        self._parents = parents
+        self._transposed = transposed
+        self.expanded = expanded
+        self.seconds = seconds
+
+    def path(self, i, j):
+        """Route from sources[i] to targets[j] as node ids, or None if unreachable."""
+        if not np.isfinite(self.costs[i, j]):
+            return None
+        if self._transposed:
+            # searched from the target: its tree leads back from the source
+            parent, node, root = self._parents[j], self.sources[i], self.targets[j]
+            path = [node]
+            while node != root:
+                node = parent[node]
+                path.append(node)
+            return path
+        return _path(self._parents[i], self.sources[i], self.targets[j])
+
+
+def distance_matrix(graph, sources, targets):
+    """
+    All source-to-target costs with one early-stopping Dijkstra per source, instead of a
+    ucs() call per pair. Edge weights are symmetric, so when there are fewer targets than
+    sources the searches start from the targets and the matrix is read transposed.
+    """
+    t0 = time.perf_counter()
+    sources, targets = [int(s) for s in sources], [int(t) for t in targets]
+    transposed = len(targets) < len(sources)
+    roots, ends = (targets, sources) if transposed else (sources, targets)
+    costs = np.full((len(roots), len(ends)), INF)
+    parents = []
+    expanded = 0
+    for i, r in enumerate(roots):
+        dist, parent, n = dijkstra_until(graph, r, ends)
+        costs[i] = [dist.get(t, INF) for t in ends]
+        parents.append(parent)
+        expanded += n
+    if transposed:
+        costs = costs.T.copy()
+    return DistanceMatrix(sources, targets, costs, parents, transposed, expanded, time.perf_counter() - t0)
+
+
+def astar(graph, start, goal, heuristic=None):
+    """
+    A* with parent pointers and a closed set: heap entries are (f, g, node) only, the
+    path is rebuilt once at the end. With heuristic=None it is UCS.
+    """
+    t0 = time.perf_counter()
+    h = heuristic.toward(goal) if heuristic is not None else None
+    g = {start: 0.0}
+    parent = {start: start}
+    closed = set()
+    pq = [(h(start) if h else 0.0, 0.0, start)]
+    expanded = pushes = 0
+    ip, idx, w = graph.indptr, graph.indices, graph.w
+    while pq:
+        _, gu, u = heapq.heappop(pq)
+        if u in closed:
+            continue
+        closed.add(u)
+        expanded += 1
+        if u == goal:
+            return SearchResult(_path(parent, start, goal), gu, expanded, pushes, time.perf_counter() - t0)
+        for e in range(ip[u], ip[u + 1]):
+            v = idx[e]
+            if v in closed:
+                continue
+            ng = gu + w[e]
+            if ng < g.get(v, INF):
+                g[v] = ng
+                parent[v] = u
+                heapq.heappush(pq, (ng + (h(v) if h else 0.0), ng, v))
+                pushes += 1
+    return SearchResult(None, None, expanded, pushes, time.perf_counter() - t0)
+
+
+def ucs(graph, start, goal):
+    return astar(graph, start, goal, None)
+
+
+def bidirectional_astar(graph, start, goal, heuristic=None):
+    """
+    Bidirectional A* with average potentials p(v) = (h_goal(v) - h_start(v)) / 2, which
+    keeps both directions consistent. Forward and backward searches alternate by the
+    smaller queue key and stop once key_f + key_b >= best meeting cost. Edge weights are
+    symmetric, so the backward search walks the same adjacency.
+    """
+    t0 = time.perf_counter()
+    if start == goal:
+        return SearchResult([start], 0.0, 1, 0, time.perf_counter() - t0)
+    if heuristic is not None:
+        ht, hs = heuristic.toward(goal), heuristic.toward(start)
+
+        def pf(v):
+            return (ht(v) - hs(v)) / 2
+    else:
+        def pf(v):
+            return 0.0
+    dist = ({start: 0.0}, {goal: 0.0})
+    parent = ({start: start}, {goal: goal})
+    closed = (set(), set())
+    sign = (1.0, -1.0)
+    pq = ([(pf(start), start)], [(-pf(goal), goal)])
+    best, meet = INF, None
+    expanded = pushes = 0
+    ip, idx, w = graph.indptr, graph.indices, graph.w
+    while pq[0] and pq[1]:
+        if pq[0][0][0] + pq[1][0][0] >= best:
+            break
+        side = 0 if pq[0][0][0] <= pq[1][0][0] else 1
+        _, u = heapq.heappop(pq[side])
+        if u in closed[side]:
+            continue
+        closed[side].add(u)
+        expanded += 1
+        du = dist[side][u]
+        other = dist[1 - side]
+        for e in range(ip[u], ip[u + 1]):
+            v = idx[e]
+            nd = du + w[e]
+            if nd < dist[side].get(v, INF):
+                dist[side][v] = nd
+                parent[side][v] = u
+                heapq.heappush(pq[side], (nd + sign[side] * pf(v), v))
+                pushes += 1
+            if v in other and nd + other[v] < best:
+                best, meet = nd + other[v], v
+    if meet is None:
+        return SearchResult(None, None, expanded, pushes, time.perf_counter() - t0)
+    path = _path(parent[0], start, meet)
+    node = meet
+    while node != goal:
+        node = parent[1][node]
+        path.append(node)
+    return SearchResult(path, best, expanded, pushes, time.perf_counter() - t0)
+
+
+def path_cost(graph, path):
+    """Sum of edge weights along a path, for checking results against the notebook."""
+    total = 0.0
+    for u, v in zip(path, path[1:]):
+        total += dict(graph.edges(u))[v]
+    return total
+
+
+if __name__ == "__main__":
+    from routing import Conditions, GridGraph, node_name
+    grid = GridGraph(5, 5)
+    cond = Conditions()
+    graph = WeightedGraph(grid, grid.edge_weights(cond))
+    runs = [("UCS", ucs(graph, 0, cond.alert_node)),
+            ("A*", astar(graph, 0, cond.alert_node, ManhattanHeuristic(graph))),
+            ("ALT A*", astar(graph, 0, cond.alert_node, landmarks_for(cond, graph, k=4))),
+            ("Bidir ALT", bidirectional_astar(graph, 0, cond.alert_node, landmarks_for(cond, graph, k=4)))]
+    for name, res in runs:
+        print(f"{name:10s}: {[node_name(u) for u in res.path]} {res.cost:.3f} Expanded: {res.expanded} "
+              f"Pushes: {res.pushes} Time: {res.seconds * 1e3:.2f} ms")
+    dm = distance_matrix(graph, [0, 4, 20], [12, 18])
+    print("dispatch matrix (bases N0, N4, N20 x alerts N12, N18):")
+    print(np.round(dm.costs, 3))
+    print("N20 -> N18:", [node_name(u) for u in dm.path(2, 1)])
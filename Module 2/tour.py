@@ -0,0 +1,183 @@
+import time
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+
+from routing import node_id
+from search import distance_matrix
+
+
+@dataclass
+class Tour:
+    """Closed patrol loop: hotspot visiting order, full node path (start repeated at the end) and cost."""
+    order: List[int]
+    path: List[int]
+    cost: float
+    seconds: float = 0.0
+    stats: dict = field(default_factory=dict)
+
+
+def patrol_targets(grid, density=None, threshold=0.5):
+    """Nodes a nightly sweep must visit: high-risk and migration nodes, plus every cell of
+    a Module 1 risk raster (`density`) at or above `threshold`."""
+    nodes = grid.high_risk | grid.migration
+    if density is not None:
+        nodes = nodes | (np.asarray(density, float).reshape(-1) >= threshold)
+    return np.flatnonzero(nodes).tolist()
+
+
+def tour_cost(D, order):
+    order = np.asarray(order)
+    return float(D[order, np.roll(order, -1)].sum())
+
+
+def nearest_neighbour(D, first=0):
+    """Greedy seed tour over matrix positions, starting at position `first`."""
+    n = len(D)
+    seen = np.zeros(n, dtype=bool)
+    order = [first]
+    seen[first] = True
+    for _ in range(n - 1):
+        row = np.where(seen, np.inf, D[order[-1]])
+        nxt = int(np.argmin(row))
+        order.append(nxt)
+        seen[nxt] = True
+    return order
+
+
+def _two_opt_moves(D, t, eps):
+    """
+    Improving 2-opt moves for tour t: move (i, j) replaces edges (t[i], t[i+1]) and
+    (t[j], t[j+1]) by (t[i], t[j]) and (t[i+1], t[j+1]). All pairs are scored at once,
+    then the best moves whose [i, j] spans do not overlap are returned; such reversals
+    do not interact, so all of them can be applied together.
+    """
+    n = len(t)
+    a, b = t, np.roll(t, -1)
+    ab = D[a, b]
+    delta = D[a[:, None], a[None, :]] + D[b[:, None], b[None, :]] - ab[:, None] - ab[None, :]
+    i, j = np.indices((n, n))
+    delta[(j <= i + 1) | ((i == 0) & (j == n - 1))] = np.inf
+    flat = delta.ravel()
+    cand = np.flatnonzero(flat < -eps)
+    if len(cand) > n:
+        cand = cand[np.argpartition(flat[cand], n)[:n]]
+    used = np.zeros(n + 1, dtype=bool)
+    moves = []
+    for k in cand[np.argsort(flat[cand], kind='stable')].tolist():
+        i, j = divmod(k, n)
+        if not used[i:j + 1].any():
+            used[i:j + 1] = True
+            moves.append((i, j))
+    return moves
+
+
+def _best_or_opt(D, t, max_len=3):
+    """Best move of a segment of 1..max_len consecutive stops (either direction) between
+    two other neighbouring stops, scored over every segment and insertion edge at once."""
+    n = len(t)
+    c, c1 = t, np.roll(t, -1)
+    gap = D[c, c1]
+    offset = (np.arange(n)[None, :] - np.arange(n)[:, None]) % n
+    best = (np.inf, None)
+    for L in range(1, min(max_len, n - 3) + 1):
+        s0, sl = t, np.roll(t, -(L - 1))
+        p, nx = np.roll(t, 1), np.roll(t, -L)
+        removed = D[p, s0] + D[sl, nx] - D[p, nx]
+        fwd = D[c[None, :], s0[:, None]] + D[sl[:, None], c1[None, :]] - gap[None, :]
+        rev = D[c[None, :], sl[:, None]] + D[s0[:, None], c1[None, :]] - gap[None, :]
+        insert = np.minimum(fwd, rev)
+        # the edges touching the segment itself are not insertion points
+        delta = np.where((offset >= n - 1) | (offset < L), np.inf, insert - removed[:, None])
+        k = int(np.argmin(delta))
+        if delta.flat[k] < best[0]:
+            i, j = divmod(k, n)
+            best = (delta.flat[k], (i, j, L, bool(rev[i, j] < fwd[i, j])))
+    return best
+
+
+def _apply_or_opt(t, i, j, L, reverse):
+    n = len(t)
+    seg = [t[(i + k) % n] for k in range(L)]
+    after = t[j]
+    rest = [t[(i + L + k) % n] for k in range(n - L)]
+    pos = rest.index(after) + 1
+    if reverse:
+        seg.reverse()
+    return np.array(rest[:pos] + seg + rest[pos:])
+
+
+def improve(D, order, budget=1.0, eps=1e-9):
+    """
+    2-opt and Or-opt local search until no improving move is left or `budget` seconds are
+    spent. Each round scores every candidate move with NumPy; all non-overlapping improving
+    2-opt moves of a round are applied together, Or-opt moves one at a time.
+    The matrix must be symmetric, as Module 2 edge weights are.
+    """
+    t = np.array(order)
+    deadline = time.perf_counter() + budget
+    moves = {'2-opt': 0, 'or-opt': 0}
+    while len(t) > 3 and time.perf_counter() < deadline:
+        two = _two_opt_moves(D, t, eps)
+        if two:
+            for i, j in two:
+                t[i + 1:j + 1] = t[i + 1:j + 1][::-1].copy()
+            moves['2-opt'] += len(two)
+            continue
+        d3, move = _best_or_opt(D, t)
+        if d3 < -eps:
+            t = _apply_or_opt(t.tolist(), *move)
+            moves['or-opt'] += 1
+            continue
+        break
+    return t.tolist(), moves
+
+
+def plan_tour(graph, targets, start=None, budget=1.0):
+    """
+    Closed patrol loop through every node in `targets`, beginning and ending at `start`
+    (default: the first target). The pairwise cost matrix is built once with
+    distance_matrix(); nearest-neighbour gives the seed tour and improve() refines it
+    with whatever is left of `budget` seconds. The budget covers the whole call, matrix
+    included, so when the matrix alone takes longer the seed tour is returned unimproved
+    (stats['matrix_seconds'] shows where the time went). The full route is stitched from
+    the matrix's lazy paths.
+    """
+    t0 = time.perf_counter()
+    stops = [node_id(x) for x in targets]
+    if start is not None and node_id(start) not in stops:
+        stops.insert(0, node_id(start))
+    first = stops.index(node_id(start)) if start is not None else 0
+    dm = distance_matrix(graph, stops, stops)
+    D = dm.costs
+    if not np.isfinite(D).all():
+        raise ValueError("some patrol targets are unreachable from each other")
+    seed = nearest_neighbour(D, first)
+    seed_cost = tour_cost(D, seed)
+    t_matrix = time.perf_counter() - t0
+    order, moves = improve(D, seed, max(0.0, budget - (time.perf_counter() - t0)))
+    k = order.index(first)
+    order = order[k:] + order[:k]
+    path = [stops[first]]
+    for a, b in zip(order, order[1:] + order[:1]):
+        path.extend(dm.path(a, b)[1:])
+    return Tour([stops[i] for i in order], path, tour_cost(D, order), time.perf_counter() - t0,
+                {'seed_cost': seed_cost, 'matrix_seconds': t_matrix, 'expanded': dm.expanded, **moves})
+
+
+if __name__ == "__main__":
+    from routing import Conditions, GridGraph, node_name
+    from search import WeightedGraph
+    grid = GridGraph(5, 5)
+    graph = WeightedGraph(grid, grid.edge_weights(Conditions()))
+    tour = plan_tour(graph, patrol_targets(grid), start=0)
+    print("5x5 sweep:", " -> ".join(node_name(u) for u in tour.order), f"cost {tour.cost:.3f}")
+
+    rng = np.random.default_rng(0)
+    grid = GridGraph(60, 60, terrain=rng.integers(0, 4, 3600), density=rng.random(3600))
+    graph = WeightedGraph(grid, grid.edge_weights(Conditions(alert_node=0)))
+    tour = plan_tour(graph, rng.choice(grid.n, 200, replace=False), budget=3.0)
+    print(f"200 hotspots: seed {tour.stats['seed_cost']:.1f} -> {tour.cost:.1f} "
+          f"({tour.stats['2-opt']} 2-opt, {tour.stats['or-opt']} or-opt moves); "
+          f"matrix {tour.stats['matrix_seconds']:.2f} s, total {tour.seconds:.2f} s")
@@ -0,0 +1,214 @@
+import argparse
+import csv
+import itertools
+import multiprocessing as mp
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Dict, List, Set
+
+from module3 import (WILDLIFE_SCHEMAS, Action, FFPlanner, GraphPlanSearch, PartialOrderPlanner, PlanningGraph,
+                     SearchPartialOrderPlanner, extract_plan, ground, pop_literal, pop_operators)
+
+ALERT_KINDS = ('Gunshot', 'Thermal', 'Intel')   # Intel alerts call for drone surveillance, the others for a patrol
+
+
+@dataclass
+class Problem:
+    """One synthetic reserve in both layouts: ground Actions for GraphPlan/FF and operator dicts for POP."""
+    name: str
+    actions: List[Action]
+    initial: Set[str]
+    goals: Set[str]
+    operators: Dict[str, Dict[str, Set[str]]]
+    pop_initial: Set[str]
+    pop_goals: Set[str]
+
+
+def wildlife_problem(zones: int, alerts: int, rangers: int, drones: int, seed: int = 0, reach: int = 3) -> Problem:
+    """
+    A reserve of `zones` zones with `alerts` alerts in distinct zones, grounded from WILDLIFE_SCHEMAS.
+
+    Alerts cycle through Gunshot/Thermal/Intel like the notebook's three; an Intel alert
+    needs a drone to monitor its zone, the others a ranger to be assigned and dispatched,
+    and every alert must be cleared (analyzed). Each ranger covers `reach` consecutive
+    zones and each drone 3 * `reach`, around a random centre; each alert additionally gets
+    one team of its own that covers it, so the problem is solvable whenever the alerts
+    needing rangers and drones do not outnumber them.
+    """
+    if alerts > zones:
+        raise ValueError(f"{alerts} alerts need at least as many zones, got {zones}")
+    rng = random.Random(seed)
+    zone = [f"Zone{i}" for i in range(zones)]
+    ranger = [f"Ranger{i + 1}" for i in range(rangers)]
+    drone = [f"Drone{i + 1}" for i in range(drones)]
+    alert = [f"{ALERT_KINDS[i % 3]}{i}" for i in range(alerts)]
+    where = rng.sample(zone, alerts)
+    initial = {f"Free({x})" for x in ranger + drone}
+    goals = set()
+    for a, z in zip(alert, where):
+        initial |= {f"Alert({a})", f"AlertAt({a},{z})"}
+        goals |= {f"AlertCleared({a})", f"SurveillanceActive({z})" if a.startswith('Intel') else f"Patrolled({z})"}
+    for teams, width, pred in ((ranger, reach, "Covers"), (drone, 3 * reach, "InRange")):
+        for t in teams:
+            c = rng.randrange(zones)
+            initial |= {f"{pred}({t},{zone[(c + k) % zones]})" for k in range(width)}
+        mine = [z for a, z in zip(alert, where) if a.startswith('Intel') == (pred == "InRange")]
+        for t, z in zip(teams, mine):
+            initial.add(f"{pred}({t},{z})")
+    g = ground(WILDLIFE_SCHEMAS, {'Zone': zone, 'Ranger': ranger, 'Drone': drone, 'Alert': alert}, initial)
+    return Problem(f"z{zones}_a{alerts}_r{rangers}_d{drones}_s{seed}", g.actions, g.initial, goals,
+                   pop_operators(g.actions), {pop_literal(x) for x in g.initial}, {pop_literal(x) for x in goals})
+
+
+def _non_noop(actions) -> int:
+    return sum(1 for a in actions if not a.name.startswith("NOOP_"))
+
+
+def _mutexes(pg) -> Dict[str, int]:
+    return {'levels': len(pg.S_levels) - 1,
+            'action_mutexes': sum(len(m) for m in pg.A_mutex),
+            'literal_mutexes': sum(len(m) for m in pg.S_mutex)}
+
+
+def _pop(p: Problem):
+    plan = PartialOrderPlanner(p.operators, p.pop_initial, p.pop_goals).solve()
+    return {'plan_length': len(plan['steps']) - 2 if plan else None}
+
+
+def _search_pop(p: Problem):
+    planner = SearchPartialOrderPlanner(p.operators, p.pop_initial, p.pop_goals)
+    plan = planner.solve()
+    return {'plan_length': len(plan['steps']) - 2 if plan else None, 'nodes': planner.stats['nodes']}
+
+
+def _graph_extract(p: Problem):
+    pg = PlanningGraph(p.actions, p.initial)
+    plan = extract_plan(pg, p.goals) if pg.build_until(p.goals, max_levels=50) else None
+    return {'plan_length': _non_noop(plan) if plan else None, **_mutexes(pg)}
+
+
+def _graphplan(p: Problem):
+    search = GraphPlanSearch(p.actions, p.initial, p.goals)
+    res = search.solve()
+    return {'plan_length': len(res.actions()) if res.plan is not None else None, 'nodes': res.stats.get('nodes'),
+            **_mutexes(search.pg)}
+
+
+def _ff(p: Problem):
+    res = FFPlanner(p.actions).solve(p.initial, p.goals)
+    return {'plan_length': len(res.plan) if res.plan is not None else None, 'nodes': res.stats.get('expanded')}
+
+
+PLANNERS = {
+    'pop': _pop,                    # PartialOrderPlanner.solve
+    'search-pop': _search_pop,      # SearchPartialOrderPlanner.solve
+    'graph-extract': _graph_extract,  # PlanningGraph.build_until + extract_plan
+    'graphplan': _graphplan,        # GraphPlanSearch on a CompiledPlanningGraph
+    'ff': _ff,                      # FFPlanner
+}
+
+
+def _measure(name: str, problem: Problem, conn):
+    """Run one planner in this (child) process and send back its record."""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    try:
+        out = PLANNERS[name](problem)
+        status = 'ok'
+    except Exception as e:
+        out, status = {}, f"error: {type(e).__name__}: {e}"
+    seconds = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    conn.send({'status': status, 'seconds': seconds, 'peak_mb': peak / 2 ** 20, **out})
+    conn.close()
+
+
+def run_one(name: str, problem: Problem, timeout: float = 30.0) -> Dict:
+    """
+    One planner on one problem in a separate process, so a planner that runs away is
+    stopped after `timeout` seconds and leaves no memory behind. Peak memory is
+    tracemalloc's peak of the allocations made while planning.
+    """
+    recv, send = mp.Pipe(duplex=False)
+    proc = mp.Process(target=_measure, args=(name, problem, send), daemon=True)
+    proc.start()
+    send.close()
+    if recv.poll(timeout):
+        rec = recv.recv()
+    else:
+        rec = {'status': 'timeout', 'seconds': timeout}
+    proc.kill()
+    proc.join()
+    rec.setdefault('plan_length', None)
+    rec['solved'] = rec['plan_length'] is not None
+    return rec
+
+
+def run(sizes, planners=tuple(PLANNERS), seeds=(0,), timeout=30.0, skip_after_timeout=True) -> List[Dict]:
+    """
+    Every planner on every (zones, alerts, rangers, drones) size and seed. Sizes should
+    grow; once a planner times out on a size it is skipped for the larger ones.
+    """
+    records = []
+    given_up = set()
+    for (zones, alerts, rangers, drones), seed in itertools.product(sizes, seeds):
+        problem = wildlife_problem(zones, alerts, rangers, drones, seed)
+        for name in planners:
+            base = {'problem': problem.name, 'zones': zones, 'alerts': alerts, 'rangers': rangers, 'drones': drones,
+                    'seed': seed, 'planner': name, 'ground_actions': len(problem.actions)}
+            if name in given_up:
+                records.append({**base, 'status': 'skipped', 'solved': False})
+                continue
+            rec = {**base, **run_one(name, problem, timeout)}
+            if rec['status'] == 'timeout' and skip_after_timeout:
+                given_up.add(name)
+            records.append(rec)
+    return records
+
+
+COLUMNS = ('problem', 'planner', 'status', 'solved', 'plan_length', 'seconds', 'peak_mb', 'levels',
+           'action_mutexes', 'literal_mutexes', 'nodes', 'ground_actions')
+
+
+def print_table(records):
+    print("  ".join(f"{c:>16s}" for c in COLUMNS[:2]) + "  " + "  ".join(f"{c[:10]:>10s}" for c in COLUMNS[2:]))
+    for r in records:
+        cells = []
+        for c in COLUMNS[2:]:
+            v = r.get(c)
+            cells.append(f"{'' if v is None else v:>10.3f}" if isinstance(v, float) else
+                         f"{'' if v is None else str(v)[:10]:>10}")
+        print(f"{r['problem']:>16s}  {r['planner']:>16s}  " + "  ".join(cells))
+
+
+def parse_size(text: str):
+    """'zones,alerts,rangers,drones', e.g. 100,20,30,5."""
+    parts = tuple(int(x) for x in text.split(','))
+    if len(parts) != 4:
+        raise argparse.ArgumentTypeError("size must be zones,alerts,rangers,drones")
+    return parts
+
+
+DEFAULT_SIZES = [(3, 3, 2, 1), (10, 6, 4, 2), (25, 12, 8, 4), (50, 24, 16, 8), (100, 45, 30, 15)]
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Benchmark the Module 3 planners on synthetic wildlife-protection problems.")
+    ap.add_argument('--sizes', type=parse_size, nargs='+', default=DEFAULT_SIZES,
+                    help="problem sizes as zones,alerts,rangers,drones (default: 3,3,2,1 up to 100,45,30,15)")
+    ap.add_argument('--planners', nargs='+', default=list(PLANNERS), choices=list(PLANNERS))
+    ap.add_argument('--seeds', type=int, nargs='+', default=[0])
+    ap.add_argument('--timeout', type=float, default=30.0, help="seconds per planner run")
+    ap.add_argument('--out', help="write the per-run records to this CSV")
+    args = ap.parse_args()
+    t0 = time.perf_counter()
+    records = run(args.sizes, args.planners, args.seeds, args.timeout)
+    print_table(records)
+    print(f"{len(records)} runs in {time.perf_counter() - t0:.1f} s")
+    if args.out:
+        with open(args.out, 'w', newline='') as f:
+            w = csv.DictWriter(f, fieldnames=['zones', 'alerts', 'rangers', 'drones', 'seed', *COLUMNS])
+            w.writeheader()
+            w.writerows(records)
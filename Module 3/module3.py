@@ -1,6 +1,12 @@
-import graphviz
-from graphviz import Digraph
 from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+import heapq
+import itertools
+import time
+
+# graphviz (and IPython for inline display) are imported by the functions that draw,
+# so importing the planners stays cheap and works without them installed.
 
 class PartialOrderPlanner:
     def __init__(self, operators, initial_state, goal_state):
@@ -155,6 +161,311 @@ class PartialOrderPlanner:
         else:
             return None
 
+def pop_negate(cond: str) -> str:
+    return cond[4:-1] if cond.startswith('NOT(') else f"NOT({cond})"
+
+class _PopNode:
+    """One partial plan of the search: steps, causal links, open conditions, pending
+    threats and the transitive closure of the orderings as bitsets over step indices.
+
+    Children share their parent's steps, links and open conditions and replace rather
+    than mutate them, and the orderings are a linked chain of pairs, so a copy only
+    duplicates the closure bitsets and the threats."""
+    def __init__(self):
+        self.steps: List[Optional[str]] = [None, None]   # 0 = Start, 1 = Finish
+        self.by_op: Dict[str, Tuple[int, ...]] = {}      # operator -> the steps using it
+        self.used: frozenset = frozenset()               # one-shot conditions a step consumes
+        self.after: List[int] = [0b10, 0]                # after[i]: steps that must follow i
+        self.before: List[int] = [0, 0b01]               # before[i]: steps that must precede i
+        self.orderings: Optional[tuple] = ((0, 1), None)  # (pair, rest of the chain)
+        self.links: List[Tuple[int, str, int]] = []
+        self.open: List[Tuple[int, str]] = []
+        self.threats: List[Tuple[int, int]] = []         # (link index, step)
+
+    def copy(self) -> "_PopNode":
+        n = _PopNode.__new__(_PopNode)
+        n.steps, n.by_op, n.links, n.open, n.orderings = self.steps, self.by_op, self.links, self.open, self.orderings
+        n.used = self.used
+        n.after, n.before, n.threats = list(self.after), list(self.before), list(self.threats)
+        return n
+
+    def ordering_pairs(self) -> List[Tuple[int, int]]:
+        pairs, chain = [], self.orderings
+        while chain is not None:
+            pairs.append(chain[0])
+            chain = chain[1]
+        return pairs
+
+    def can_order(self, a: int, b: int) -> bool:
+        """a < b is consistent unless b already precedes (or is) a: one bit test."""
+        return a != b and not self.after[b] >> a & 1
+
+    def order(self, a: int, b: int):
+        if self.after[a] >> b & 1:
+            return
+        self.orderings = ((a, b), self.orderings)
+        succ = self.after[b] | (1 << b)
+        pred = self.before[a] | (1 << a)
+        for x in iter_bits(pred):
+            self.after[x] |= succ
+        for y in iter_bits(succ):
+            self.before[y] |= pred
+
+class SearchPartialOrderPlanner(PartialOrderPlanner):
+    """
+    Partial order planner that searches over plans instead of committing greedily.
+
+    Every choice of achiever for an open condition (the initial state, a step already in
+    the plan, or a new step) and every promotion/demotion of a threat is a branch; partial
+    plans wait in a best-first queue ordered by their size plus the estimated cost of their
+    open conditions and threats, so a dead end backtracks to the next alternative. Orderings
+    are kept as an incrementally maintained transitive closure, so a consistency check is
+    one bit test instead of a cycle search. Operators can be used by several steps.
+    solve() returns the plan in the same dict layout as PartialOrderPlanner.
+
+    A goal that is unreachable even with deletes ignored is reported at once, and operators
+    whose preconditions are unreachable are never added. Otherwise an unsolvable problem
+    is searched until a bound is hit: partial plans longer than `max_steps` are dropped, and
+    solve() gives up after `max_nodes` expansions or `time_limit` seconds.
+    """
+    def __init__(self, operators, initial_state, goal_state):
+        super().__init__(operators, initial_state, goal_state)
+        self.achievers: Dict[str, List[str]] = {}
+        for name, op in operators.items():
+            for eff in op['effects']:
+                self.achievers.setdefault(eff, []).append(name)
+        self.cost = self.relaxed_costs()
+        self.op_cost = {name: 1 + sum(self.cost.get(p, INF_COST) for p in op['preconditions'])
+                        for name, op in operators.items()}
+        # one-shot conditions: required and deleted by an operator, and added by none
+        self.consumes = {name: {c for c in op['preconditions'] if pop_negate(c) in op['effects'] and
+                                c not in self.achievers} for name, op in operators.items()}
+        self.support: Dict[str, Set[str]] = {}
+        for name in operators:
+            self.support_of(name)
+        self.stats = {'nodes': 0, 'generated': 0, 'dead_ends': 0}
+
+    def support_of(self, op: str, path: frozenset = frozenset()) -> Set[str]:
+        """`op` and, recursively, the sole achiever of each precondition that has one and
+        does not hold initially: the steps a new `op` step is bound to bring along."""
+        if op not in self.support:
+            out = {op}
+            for c in self.operators[op]['preconditions']:
+                ach = self.achievers.get(c, ())
+                if len(ach) == 1 and not self.holds_initially(c) and ach[0] not in path:
+                    out |= self.support_of(ach[0], path | {op})
+            self.support[op] = out
+        return self.support[op]
+
+    def viable(self, node: _PopNode, op: str) -> bool:
+        """A new `op` step, and the steps it brings along, consume nothing a step already consumed.
+        No ordering can give two steps the same one-shot condition, so this loses no plan."""
+        return not any(self.consumes[s] & node.used for s in self.support[op] if s == op or s not in node.by_op)
+
+    def relaxed_costs(self) -> Dict[str, float]:
+        """
+        h_add from the initial state, deletes ignored: 0 for a condition that holds there,
+        otherwise 1 plus the precondition costs of its cheapest achiever. Conditions
+        missing from the result are unreachable.
+        """
+        cost: Dict[str, float] = {}
+        conds = {c for op in self.operators.values() for c in op['preconditions'] | op['effects']}
+        for c in conds | set(self.goal_state):
+            if self.holds_initially(c):
+                cost[c] = 0
+        changed = True
+        while changed:
+            changed = False
+            for op in self.operators.values():
+                pre = [cost.get(p, INF_COST) for p in op['preconditions']]
+                c = 1 + sum(pre)
+                if c == INF_COST:
+                    continue
+                for eff in op['effects']:
+                    if c < cost.get(eff, INF_COST):
+                        cost[eff] = c
+                        changed = True
+        return cost
+
+    def step_effects(self, node: _PopNode, i: int) -> Set[str]:
+        if i == 0:
+            return self.initial_state
+        if i == 1:
+            return set()
+        return self.operators[node.steps[i]]['effects']
+
+    def holds_initially(self, cond: str) -> bool:
+        if cond.startswith('NOT('):
+            return cond[4:-1] not in self.initial_state
+        return cond in self.initial_state
+
+    def threatens(self, node: _PopNode, link: Tuple[int, str, int], s: int) -> bool:
+        producer, cond, consumer = link
+        if s in (producer, consumer) or s == 0:
+            return False
+        if pop_negate(cond) not in self.step_effects(node, s):
+            return False
+        # only a step that can still fall between producer and consumer is a threat
+        return node.can_order(producer, s) and node.can_order(s, consumer)
+
+    def add_link(self, node: _PopNode, producer: int, cond: str, consumer: int):
+        node.order(producer, consumer)
+        node.links = node.links + [(producer, cond, consumer)]
+        li = len(node.links) - 1
+        for s in range(2, len(node.steps)):
+            if self.threatens(node, node.links[li], s):
+                node.threats.append((li, s))
+
+    def add_step(self, node: _PopNode, op: str) -> int:
+        i = len(node.steps)
+        node.steps = node.steps + [op]
+        node.by_op = {**node.by_op, op: node.by_op.get(op, ()) + (i,)}
+        if self.consumes[op]:
+            node.used = node.used | self.consumes[op]
+        node.after.append(0)
+        node.before.append(0)
+        node.order(0, i)
+        node.order(i, 1)
+        node.open = node.open + [(i, pre) for pre in sorted(self.operators[op]['preconditions'])]
+        neg = {pop_negate(e) for e in self.operators[op]['effects']}
+        for li, link in enumerate(node.links):
+            if link[1] in neg and self.threatens(node, link, i):
+                node.threats.append((li, i))
+        return i
+
+    def successors(self, node: _PopNode) -> List[_PopNode]:
+        node.threats = [t for t in node.threats if self.threatens(node, node.links[t[0]], t[1])]
+        if node.threats:
+            # the threat with the fewest resolutions first: none is a dead end, one is forced
+            best = None
+            for idx, (li, s) in enumerate(node.threats):
+                producer, _, consumer = node.links[li]
+                fixes = [(a, b) for a, b in ((s, producer), (consumer, s))     # demotion, promotion
+                         if a != 0 and b != 1 and node.can_order(a, b)]
+                if best is None or len(fixes) < len(best[1]):
+                    best = (idx, fixes)
+                    if len(fixes) <= 1:
+                        break
+            idx, fixes = best
+            children = []
+            for a, b in fixes:
+                child = node.copy()
+                del child.threats[idx]
+                child.order(a, b)
+                children.append(child)
+            return children
+        # open condition with the fewest ways to achieve it first
+        best = None
+        for idx, (step, cond) in enumerate(node.open):
+            options = self.options(node, step, cond)
+            if best is None or len(options) < len(best[1]):
+                best = (idx, options)
+                if len(options) <= 1:
+                    break
+        idx, options = best
+        step, cond = node.open[idx]
+        children = []
+        for kind, who in options:
+            child = node.copy()
+            child.open = child.open[:idx] + child.open[idx + 1:]
+            producer = self.add_step(child, who) if kind == 'new' else who
+            self.add_link(child, producer, cond, step)
+            children.append(child)
+        return children
+
+    def options(self, node: _PopNode, step: int, cond: str) -> List[Tuple[str, object]]:
+        opts: List[Tuple[str, object]] = []
+        if self.holds_initially(cond):
+            opts.append(('old', 0))
+        steps = [s for op in self.achievers.get(cond, ()) for s in node.by_op.get(op, ())]
+        opts.extend(('old', s) for s in sorted(steps) if s != step and node.can_order(s, step))
+        opts.extend(('new', op) for op in self.achievers.get(cond, ())
+                    if self.op_cost[op] < INF_COST and self.viable(node, op))
+        return opts
+
+    def rank(self, node: _PopNode) -> float:
+        """
+        Steps so far plus open conditions and threats plus the relaxed cost of each distinct
+        open condition that neither the initial state nor a reachable step already in the
+        plan provides; infinite when one cannot be reached at all.
+        """
+        h = 0
+        for cond in {c for _, c in node.open}:
+            if self.cost.get(cond) == 0 or any(op in node.by_op and self.op_cost[op] < INF_COST
+                                               for op in self.achievers.get(cond, ())):
+                continue
+            h += self.cost.get(cond, INF_COST)
+        return len(node.steps) + len(node.open) + len(node.threats) + h
+
+    def solve(self, max_nodes: int = 100000, max_steps: Optional[int] = None, time_limit: Optional[float] = None):
+        """
+        The first complete plan found, or None. `max_steps` bounds the steps of a partial
+        plan (default: twice the number of operators plus the number of goals), which also
+        bounds the work per node; `stats['stopped']` says which limit ended a failed search.
+        """
+        t0 = time.perf_counter()
+        if max_steps is None:
+            max_steps = 2 * len(self.operators) + len(self.goal_state)
+        self.stats = {'nodes': 0, 'generated': 0, 'dead_ends': 0, 'pruned': 0, 'stopped': None}
+        root = _PopNode()
+        for goal in sorted(self.goal_state):
+            root.open.append((1, goal))
+        rank = self.rank(root)
+        if rank == INF_COST:
+            self.stats['stopped'] = 'unreachable'
+            return None
+        tie = itertools.count()
+        queue = [(rank, 0, next(tie), root)]
+        while queue:
+            _, depth, _, node = heapq.heappop(queue)
+            self.stats['nodes'] += 1
+            if not node.open and not any(self.threatens(node, node.links[li], s) for li, s in node.threats):
+                self.last_node = node
+                return self.to_plan(node)
+            if self.stats['nodes'] > max_nodes:
+                self.stats['stopped'] = 'max_nodes'
+                return None
+            if time_limit is not None and time.perf_counter() - t0 > time_limit:
+                self.stats['stopped'] = 'time_limit'
+                return None
+            children = self.successors(node)
+            if not children:
+                self.stats['dead_ends'] += 1
+            for child in children:
+                self.stats['generated'] += 1
+                rank = self.rank(child)
+                if rank == INF_COST or len(child.steps) - 2 > max_steps:
+                    self.stats['pruned'] += 1
+                    continue
+                heapq.heappush(queue, (rank, depth - 1, next(tie), child))
+        self.stats['stopped'] = 'exhausted'
+        return None
+
+    def step_name(self, node: _PopNode, i: int) -> str:
+        if i < 2:
+            return ('Start', 'Finish')[i]
+        op = node.steps[i]
+        n = sum(1 for s in node.steps[2:i] if s == op)
+        return op if n == 0 else f"{op}#{n + 1}"
+
+    def to_plan(self, node: _PopNode):
+        names = [self.step_name(node, i) for i in range(len(node.steps))]
+        steps = {'Start': {'type': 'initial', 'effects': self.initial_state},
+                 'Finish': {'type': 'goal', 'preconditions': self.goal_state}}
+        for i in range(2, len(node.steps)):
+            steps[names[i]] = self.operators[node.steps[i]]
+        return {
+            'steps': steps,
+            'orderings': sorted({(names[a], names[b]) for a, b in node.ordering_pairs()}),
+            'links': [(names[p], c, names[q]) for p, c, q in node.links],
+            'open_preconditions': [],
+            'order': [names[i] for i in self.linearize(node)],
+        }
+
+    def linearize(self, node: _PopNode) -> List[int]:
+        """A total order consistent with the plan: steps sorted by how many must precede them."""
+        return sorted(range(len(node.steps)), key=lambda i: bin(node.before[i]).count("1"))
+
 def create_wildlife_problem():
     operators = {
         'Analyze_Gunshot': {
@@ -198,6 +509,7 @@ def create_wildlife_problem():
     return operators, initial_state, goal_state
 
 def create_clear_pop_graph():
+    from graphviz import Digraph
     dot = Digraph(
         comment="Wildlife Poaching POP Plan",
         graph_attr={
@@ -294,7 +606,17 @@ ACTION COLORS:
 
     return dot
 
-def main():
+def show(graph):
+    """Display a graph inline when running under IPython; elsewhere the rendered PNG is the output."""
+    try:
+        from IPython import get_ipython
+        from IPython.display import display
+    except ImportError:
+        return
+    if get_ipython() is not None:
+        display(graph)
+
+def pop_demo(render: bool = True):
     print("Wildlife Poaching Prevention - POP Execution\n" + "="*60)
     operators, initial_state, goal_state = create_wildlife_problem()
     planner = PartialOrderPlanner(operators, initial_state, goal_state)
@@ -302,22 +624,14 @@ def main():
 
     if solution:
         print("Planning Successful! Displaying POP Graph...\n")
-        graph = create_clear_pop_graph()
-        display(graph)
-        graph.render("wildlife_pop_graph", format="png", cleanup=True)
-        print("Graph saved as wildlife_pop_graph.png")
+        if render:
+            graph = create_clear_pop_graph()
+            show(graph)
+            graph.render("wildlife_pop_graph", format="png", cleanup=True)
+            print("Graph saved as wildlife_pop_graph.png")
     else:
         print("Planning Failed")
-
-
-if __name__ == "__main__":
-    main()
-
-from dataclasses import dataclass
-from typing import Set, Tuple, Dict, List, Optional
-import itertools
-import matplotlib.pyplot as plt
-import networkx as nx
+    return solution
 
 def is_neg(lit: str) -> bool:
     return lit.startswith("¬")
@@ -426,8 +740,9 @@ class PlanningGraph:
         return mutex_pairs
 
     def inconsistent_effects(self, a1: Action, a2: Action) -> bool:
-        adds1, adds2 = set(a1.add), set(a2.add)
-        return any(negate(x) in adds2 for x in adds1) or any(negate(x) in adds1 for x in adds2)
+        # rem literals are effects too: adding X and asserting ¬X conflict
+        effects2 = set(a2.add) | set(a2.rem)
+        return any(negate(x) in effects2 for x in a1.add + a1.rem)
 
     def interference(self, a1: Action, a2: Action) -> bool:
         if any(negate(p) in a1.add or negate(p) in a1.rem for p in a2.pre):
@@ -512,19 +827,949 @@ def extract_plan(pg: PlanningGraph, goals: Set[str]) -> Optional[List[Action]]:
         return backtrack(0, [], set())
 
     return dfs(last_level, goals, [])
-pg = PlanningGraph(domain_actions, S0)
-reachable = pg.build_until(GOALS, max_levels=8)
-plan = extract_plan(pg, GOALS)
-
-print("Goals reachable:", reachable)
-print("\n--- Extracted Plan (GraphPlan) ---")
-if plan:
-    for i, a in enumerate(plan, 1):
-        print(f"{i}. {a.name}  Pre={list(a.pre)}  Add={list(a.add)}")
-else:
-    print("No plan found.")
+def iter_bits(x: int):
+    while x:
+        low = x & -x
+        yield low.bit_length() - 1
+        x ^= low
+
+class _PairLevels:
+    """Per-level mutex pairs as name tuples, materialized from the bitset rows on first access."""
+    def __init__(self, rows: List[Dict[int, int]], to_pairs):
+        self.rows = rows
+        self.to_pairs = to_pairs
+        self.cache: Dict[int, Set[Tuple[str, str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, k: int) -> Set[Tuple[str, str]]:
+        k = range(len(self.rows))[k]
+        if k not in self.cache:
+            self.cache[k] = self.to_pairs(self.rows[k])
+        return self.cache[k]
+
+    def __iter__(self):
+        return (self[k] for k in range(len(self.rows)))
+
+class CompiledPlanningGraph(PlanningGraph):
+    """
+    PlanningGraph with literals and actions interned as integers. States, preconditions,
+    effects and mutex relations are Python-int bitsets, so applicability and mutex tests
+    are word-wise ANDs. The mutex rules are those of PlanningGraph (inconsistent effects,
+    interference, competing needs, supporter mutex) and S_levels, A_levels, S_mutex and
+    A_mutex hold the same sets, so extract_plan and the visualizer work unchanged; the
+    mutex pair sets are only materialized when a level is read.
+    """
+    def __init__(self, actions: List[Action], initial: Set[str]):
+        super().__init__(actions, initial)
+        self.lits: List[str] = []
+        self.lit_id: Dict[str, int] = {}
+        self.neg: List[int] = []
+        self.ops: List[Action] = []
+        self.noop_id: Dict[int, int] = {}
+        self.op_pre: List[int] = []
+        self.op_add: List[int] = []
+        self.op_lists: List[Tuple[List[int], List[int], List[int]]] = []
+        self.domain_ids = [self.intern_action(a) for a in actions]
+        self.S_bits: List[int] = [self.bits_of(initial)]
+        self.A_bits: List[int] = []
+        self.supporters: List[Dict[int, int]] = []
+        self.a_rows: List[Dict[int, int]] = []
+        self.s_rows: List[Dict[int, int]] = []
+        self.A_mutex = _PairLevels(self.a_rows, lambda rows: self.pairs(rows, self.ops, lambda a: a.name))
+        self.S_mutex = _PairLevels(self.s_rows, lambda rows: self.pairs(rows, self.lits, lambda l: l))
+
+    def intern(self, lit: str) -> int:
+        i = self.lit_id.get(lit)
+        if i is None:
+            i = self.lit_id[lit] = len(self.lits)
+            self.lits.append(lit)
+            self.neg.append(-1)
+            j = self.intern(negate(lit))
+            self.neg[i], self.neg[j] = j, i
+        return i
+
+    def bits_of(self, lits) -> int:
+        x = 0
+        for lit in lits:
+            x |= 1 << self.intern(lit)
+        return x
+
+    def intern_action(self, a: Action) -> int:
+        pre = [self.intern(p) for p in a.pre]
+        add = [self.intern(p) for p in a.add]
+        addrem = add + [self.intern(p) for p in a.rem]
+        self.ops.append(a)
+        self.op_pre.append(sum(1 << i for i in set(pre)))
+        self.op_add.append(sum(1 << i for i in set(add)))
+        self.op_lists.append((pre, add, addrem))
+        return len(self.ops) - 1
+
+    def noop(self, lit: int) -> int:
+        """NOOP action id for a literal id, created once and reused at every level."""
+        op = self.noop_id.get(lit)
+        if op is None:
+            name = self.lits[lit]
+            op = self.noop_id[lit] = self.intern_action(Action(f"NOOP_{name}", pre=(name,), add=(name,), rem=()))
+        return op
+
+    def level_actions(self, S: int) -> int:
+        x = 0
+        for op in self.domain_ids:
+            if not self.op_pre[op] & ~S:
+                x |= 1 << op
+        for lit in iter_bits(S):
+            x |= 1 << self.noop(lit)
+        return x
+
+    def action_mutex_rows(self, A: int) -> Dict[int, int]:
+        with_pre: Dict[int, int] = {}
+        with_addrem: Dict[int, int] = {}
+        ops = list(iter_bits(A))
+        for op in ops:
+            bit = 1 << op
+            pre, add, addrem = self.op_lists[op]
+            for l in pre:
+                with_pre[l] = with_pre.get(l, 0) | bit
+            for l in addrem:
+                with_addrem[l] = with_addrem.get(l, 0) | bit
+        neg = self.neg
+        rows = {}
+        for op in ops:
+            pre, add, addrem = self.op_lists[op]
+            row = 0
+            for l in addrem:                                     # inconsistent effects / interference
+                row |= with_addrem.get(neg[l], 0) | with_pre.get(neg[l], 0)
+            for l in pre:                                        # interference / competing needs
+                row |= with_addrem.get(neg[l], 0) | with_pre.get(neg[l], 0)
+            rows[op] = row & ~(1 << op)
+        return rows
+
+    def level_supporters(self, A: int) -> Dict[int, int]:
+        supporters: Dict[int, int] = {}
+        for op in iter_bits(A):
+            for l in self.op_lists[op][1]:
+                supporters[l] = supporters.get(l, 0) | (1 << op)
+        return supporters
+
+    def literal_row(self, p: int, supporters: Dict[int, int], rows: Dict[int, int], S: int) -> int:
+        """Literals mutex with p: its negation, or every supporter pair mutex."""
+        common = -1
+        for op in iter_bits(supporters[p]):
+            common &= rows[op]
+            if not common:
+                break
+        row = 0
+        if self.neg[p] in supporters:
+            row |= 1 << self.neg[p]
+        if common:
+            candidates = 0
+            for op in iter_bits(common):
+                candidates |= self.op_add[op]
+            for q in iter_bits(candidates & S & ~(1 << p)):
+                if not supporters[q] & ~common:
+                    row |= 1 << q
+        return row
+
+    def literal_mutex_rows(self, supporters: Dict[int, int], rows: Dict[int, int]) -> Tuple[int, Dict[int, int]]:
+        S = sum(1 << l for l in supporters)
+        return S, {p: self.literal_row(p, supporters, rows, S) for p in supporters}
+
+    def expand(self):
+        """Add one action level and the state level after it."""
+        S = self.S_bits[-1]
+        A = self.level_actions(S)
+        rows = self.action_mutex_rows(A)
+        supporters = self.level_supporters(A)
+        S_next, s_rows = self.literal_mutex_rows(supporters, rows)
+        self.A_bits.append(A)
+        self.supporters.append(supporters)
+        self.a_rows.append(rows)
+        self.A_levels.append({self.ops[op] for op in iter_bits(A)})
+        self.S_bits.append(S_next)
+        self.s_rows.append(s_rows)
+        self.S_levels.append({self.lits[l] for l in iter_bits(S_next)})
+
+    def build_until(self, goals: Set[str], max_levels: int = 8) -> bool:
+        k = len(self.A_bits)
+        while k < max_levels:
+            self.expand()
+            leveled_off = self.S_bits[k + 1] == self.S_bits[k]
+            if goals.issubset(self.S_levels[k + 1]) and self.goals_non_mutex(goals, k + 1):
+                return True
+            k += 1
+            if leveled_off:
+                break
+        return False
+
+    def goals_non_mutex(self, goals: Set[str], s_level: int) -> bool:
+        if s_level - 1 >= len(self.s_rows):
+            return True
+        rows = self.s_rows[s_level - 1]
+        ids = [self.lit_id[g] for g in goals if g in self.lit_id]
+        bits = sum(1 << i for i in set(ids))
+        return not any(rows.get(i, 0) & bits for i in ids)
+
+    @staticmethod
+    def pairs(rows: Dict[int, int], items, key) -> Set[Tuple[str, str]]:
+        return {(key(items[i]), key(items[j])) for i, row in rows.items() for j in iter_bits(row) if j > i}
+
+@dataclass
+class GraphPlanResult:
+    plan: Optional[List[List[Action]]]
+    levels: int
+    stats: Dict[str, int]
+
+    def actions(self, noops: bool = False) -> List[Action]:
+        """The plan level by level, NOOPs left out unless asked for."""
+        return [a for step in self.plan or [] for a in step if noops or not a.name.startswith("NOOP_")]
+
+class GraphPlanSearch:
+    """
+    Blum & Furst GraphPlan on a CompiledPlanningGraph: expand until the goals appear
+    pairwise non-mutex, try backward extraction, and on failure expand one more level
+    and try again. Goal sets that failed at a level are kept in a per-level nogood table
+    and never searched twice. Once the graph has leveled off, a stage that adds no new
+    nogood at the level-off level proves the problem unsolvable. An already built graph
+    for the same initial state (e.g. an IncrementalPlanningGraph) can be passed as `pg`.
+    """
+    def __init__(self, actions: List[Action], initial: Set[str], goals: Set[str],
+                 pg: Optional[CompiledPlanningGraph] = None):
+        self.pg = pg or CompiledPlanningGraph(actions, initial)
+        self.goals = self.pg.bits_of(goals)
+        self.nogoods: List[Set[int]] = [set()]
+        self.stats = {'levels': 0, 'stages': 0, 'nodes': 0, 'memo_hits': 0, 'nogoods': 0, 'backtracks': 0}
+
+    def non_mutex(self, k: int, bits: int) -> bool:
+        if k == 0:
+            return True
+        rows = self.pg.s_rows[k - 1]
+        return not any(rows.get(g, 0) & bits for g in iter_bits(bits))
+
+    def leveled_off(self, k: int) -> bool:
+        pg = self.pg
+        if k == 0 or pg.S_bits[k] != pg.S_bits[k - 1]:
+            return False
+        return pg.s_rows[k - 1] == (pg.s_rows[k - 2] if k > 1 else {})
+
+    def extract(self, k: int, goals: int) -> Optional[List[List[int]]]:
+        if k == 0:
+            return []
+        self.stats['nodes'] += 1
+        if goals in self.nogoods[k]:
+            self.stats['memo_hits'] += 1
+            return None
+        plan = None
+        if self.non_mutex(k, goals):
+            supp = self.pg.supporters[k - 1]
+            order = sorted(iter_bits(goals), key=lambda g: bin(supp[g]).count("1"))
+            plan = self.assign(k, order, 0, 0, [], 0)
+        if plan is None:
+            self.nogoods[k].add(goals)
+            self.stats['nogoods'] += 1
+        return plan
+
+    def assign(self, k: int, order: List[int], i: int, chosen: int, steps: List[int], subgoals: int) -> Optional[List[List[int]]]:
+        pg = self.pg
+        while i < len(order) and chosen and any(pg.op_add[a] >> order[i] & 1 for a in steps):
+            i += 1
+        if i == len(order):
+            sub = self.extract(k - 1, subgoals)
+            return None if sub is None else sub + [steps]
+        rows = pg.a_rows[k - 1]
+        s_rows = pg.s_rows[k - 2] if k > 1 else {}
+        g = order[i]
+        # NOOPs first: persisting a literal adds no new subgoals
+        producers = sorted(iter_bits(pg.supporters[k - 1][g]), key=lambda a: pg.ops[a].name != f"NOOP_{pg.lits[g]}")
+        for a in producers:
+            if rows[a] & chosen:
+                continue
+            # forward check: a precondition mutex with a subgoal already collected fails one level down anyway
+            if any(s_rows.get(p, 0) & subgoals for p in pg.op_lists[a][0]):
+                continue
+            plan = self.assign(k, order, i + 1, chosen | (1 << a), steps + [a], subgoals | pg.op_pre[a])
+            if plan is not None:
+                return plan
+            self.stats['backtracks'] += 1
+        return None
+
+    def solve(self, max_levels: int = 50) -> GraphPlanResult:
+        pg = self.pg
+        k = 0
+        level_off_at = None
+        last_count = None
+        while True:
+            if level_off_at is None and self.leveled_off(k):
+                level_off_at = k
+            if not self.goals & ~pg.S_bits[k] and self.non_mutex(k, self.goals):
+                self.stats['stages'] += 1
+                plan = self.extract(k, self.goals)
+                if plan is not None:
+                    return GraphPlanResult([[pg.ops[a] for a in step] for step in plan], k, dict(self.stats))
+                if level_off_at is not None:
+                    count = len(self.nogoods[level_off_at])
+                    if count == last_count:
+                        break
+                    last_count = count
+            elif level_off_at is not None:
+                break
+            if k >= max_levels:
+                break
+            if k + 1 == len(pg.S_bits):
+                pg.expand()
+            self.nogoods.append(set())
+            self.stats['levels'] += 1
+            k += 1
+        return GraphPlanResult(None, k, dict(self.stats))
+
+def graphplan(actions: List[Action], initial: Set[str], goals: Set[str], max_levels: int = 50) -> GraphPlanResult:
+    return GraphPlanSearch(actions, initial, goals).solve(max_levels)
+
+class IncrementalPlanningGraph(CompiledPlanningGraph):
+    """
+    A CompiledPlanningGraph that is kept across replans. update() changes S0 and repairs
+    the built levels in place: at each level only the actions whose preconditions touch
+    a changed literal are re-tested, only the mutex rows and literal mutexes that involve
+    an action that appeared or disappeared are recomputed, and the repair stops at the
+    first level whose state is unchanged, since every later level depends only on it.
+    Action mutexes are fixed pairwise relations here (competing needs does not look at
+    the previous level), so each action's row is computed once over all known actions and
+    a level's row is that row masked by the level's actions.
+    """
+    def __init__(self, actions: List[Action], initial: Set[str]):
+        self.g_pre: Dict[int, int] = {}
+        self.g_addrem: Dict[int, int] = {}
+        self.static_rows: Dict[int, int] = {}
+        super().__init__(actions, initial)
+        self.stats = {'updates': 0, 'levels_repaired': 0, 'actions_retested': 0, 'rows_recomputed': 0}
+
+    def intern_action(self, a: Action) -> int:
+        op = super().intern_action(a)
+        bit = 1 << op
+        pre, add, addrem = self.op_lists[op]
+        for l in pre:
+            self.g_pre[l] = self.g_pre.get(l, 0) | bit
+        for l in addrem:
+            self.g_addrem[l] = self.g_addrem.get(l, 0) | bit
+        if self.static_rows:
+            # keep already computed rows symmetric with the new action
+            row = self.static_row(op)
+            for other in iter_bits(row):
+                if other in self.static_rows:
+                    self.static_rows[other] |= bit
+        return op
+
+    def static_row(self, op: int) -> int:
+        row = self.static_rows.get(op)
+        if row is None:
+            pre, add, addrem = self.op_lists[op]
+            neg = self.neg
+            row = 0
+            for l in addrem:
+                row |= self.g_addrem.get(neg[l], 0) | self.g_pre.get(neg[l], 0)
+            for l in pre:
+                row |= self.g_addrem.get(neg[l], 0) | self.g_pre.get(neg[l], 0)
+            row = self.static_rows[op] = row & ~(1 << op)
+        return row
+
+    def action_mutex_rows(self, A: int) -> Dict[int, int]:
+        return {op: self.static_row(op) & A for op in iter_bits(A)}
+
+    def update(self, add: Set[str] = frozenset(), remove: Set[str] = frozenset()) -> int:
+        """Change S0 by `add`/`remove` and repair the built levels; returns how many were repaired."""
+        S0 = (self.S_bits[0] | self.bits_of(add)) & ~self.bits_of(remove)
+        self.stats['updates'] += 1
+        changed = S0 ^ self.S_bits[0]
+        self.S_bits[0] = S0
+        self.S_levels[0] = {self.lits[l] for l in iter_bits(S0)}
+        repaired = 0
+        for k in range(len(self.A_bits)):
+            if not changed:
+                break
+            changed = self.repair_level(k, changed)
+            repaired += 1
+        self.stats['levels_repaired'] += repaired
+        return repaired
+
+    def repair_level(self, k: int, changed_S: int) -> int:
+        """Bring action level k and state level k + 1 in line with a changed S_k; returns the change of S_k+1."""
+        S = self.S_bits[k]
+        candidates = 0
+        for l in iter_bits(changed_S):
+            # actions needing l, including the NOOP that carries it forward
+            candidates |= self.g_pre.get(l, 0)
+            if S >> l & 1:
+                candidates |= 1 << self.noop(l)
+        A_old = self.A_bits[k]
+        A = A_old & ~candidates
+        for op in iter_bits(candidates):
+            self.stats['actions_retested'] += 1
+            if not self.op_pre[op] & ~S:
+                A |= 1 << op
+        delta = A ^ A_old
+        if not delta:
+            return 0
+        rows, supporters, s_rows = self.a_rows[k], self.supporters[k], self.s_rows[k]
+        touched = delta
+        for op in iter_bits(delta):
+            touched |= self.static_row(op)
+        for op in iter_bits(delta & A_old):
+            del rows[op]
+        for op in iter_bits(touched & A):
+            rows[op] = self.static_row(op) & A
+            self.stats['rows_recomputed'] += 1
+        lits = set()
+        for op in iter_bits(delta):
+            bit = 1 << op
+            for l in self.op_lists[op][1]:
+                supporters[l] = supporters.get(l, 0) ^ bit
+                lits.add(l)
+        for op in iter_bits(touched & A):
+            lits.update(self.op_lists[op][1])
+        S_old = S_next = self.S_bits[k + 1]
+        for l in lits:
+            if supporters.get(l):
+                S_next |= 1 << l
+            else:
+                supporters.pop(l, None)
+                S_next &= ~(1 << l)
+        for p in lits:
+            old = s_rows.pop(p, 0)
+            new = 0
+            if p in supporters:
+                new = s_rows[p] = self.literal_row(p, supporters, rows, S_next)
+            # the relation is symmetric: mirror the change into rows that are not recomputed
+            for q in iter_bits(old ^ new):
+                if q not in lits and q in s_rows:
+                    s_rows[q] ^= 1 << p
+        self.A_bits[k] = A
+        self.A_levels[k] = {self.ops[op] for op in iter_bits(A)}
+        self.S_bits[k + 1] = S_next
+        self.S_levels[k + 1] = {self.lits[l] for l in iter_bits(S_next)}
+        self.A_mutex.cache.pop(k, None)
+        self.S_mutex.cache.pop(k, None)
+        return S_next ^ S_old
+
+    def build_until(self, goals: Set[str], max_levels: int = 8) -> bool:
+        """Like PlanningGraph.build_until, but levels that are already built are checked first."""
+        for k in range(1, len(self.S_bits)):
+            if goals.issubset(self.S_levels[k]) and self.goals_non_mutex(goals, k):
+                return True
+        return super().build_until(goals, max_levels)
+
+    def plan(self, goals: Set[str], max_levels: int = 50) -> GraphPlanResult:
+        """GraphPlan on this graph; nogoods are per call, the graph is kept."""
+        return GraphPlanSearch(self.actions, self.S_levels[0], goals, pg=self).solve(max_levels)
+
+INF_COST = float("inf")
+
+@dataclass
+class ForwardPlanResult:
+    plan: Optional[List[Action]]
+    stats: Dict[str, float]
+
+class FFPlanner:
+    """
+    Forward state-space planner with the FF relaxed-plan heuristic (Hoffmann & Nebel).
+
+    Literals are interned as integers and a state is a Python-int bitset, so applicability
+    is one AND and states hash cheaply into the duplicate-detection table. Applying an
+    action removes the negation of every literal it asserts (add and rem) and then adds
+    its add list, the reading of rem=("¬Free(Ranger1)",) the planning graph uses.
+    Search is enforced hill-climbing over helpful actions, falling back to greedy
+    best-first search over all actions when hill-climbing reaches a dead end.
+
+    Everything is iterated in action-index and literal-name order, so a run depends only
+    on the order of `actions`, not on the hash seed.
+    """
+    def __init__(self, actions: List[Action]):
+        self.actions = list(actions)
+        self.lit_id: Dict[str, int] = {}
+        self.pre: List[List[int]] = []
+        self.add: List[List[int]] = []
+        self.pre_bits: List[int] = []
+        self.add_bits: List[int] = []
+        self.del_bits: List[int] = []
+        for a in self.actions:
+            pre = sorted({self.intern(p) for p in a.pre})
+            add = sorted({self.intern(p) for p in a.add})
+            self.pre.append(pre)
+            self.add.append(add)
+            self.pre_bits.append(sum(1 << p for p in pre))
+            self.add_bits.append(sum(1 << p for p in add))
+            dels = {self.intern(negate(p)) for p in a.add + a.rem}
+            self.del_bits.append(sum(1 << p for p in dels) & ~self.add_bits[-1])
+        self.by_pre: List[List[int]] = [[] for _ in self.lit_id]
+        self.by_add: List[List[int]] = [[] for _ in self.lit_id]
+        for i, (pre, add) in enumerate(zip(self.pre, self.add)):
+            for p in pre:
+                self.by_pre[p].append(i)
+            for q in add:
+                self.by_add[q].append(i)
+        self.support: List[Optional[frozenset]] = [None] * len(self.actions)
+        for i in range(len(self.actions)):
+            self.support_of(i)
+        self.no_pre = [i for i, pre in enumerate(self.pre) if not pre]
+        self.h_cache: Dict[int, Tuple[float, List[int]]] = {}
+        self.stats: Dict[str, float] = {}
+
+    def intern(self, lit: str) -> int:
+        i = self.lit_id.get(lit)
+        if i is None:
+            i = self.lit_id[lit] = len(self.lit_id)
+            if hasattr(self, 'by_pre'):
+                self.by_pre.append([])
+                self.by_add.append([])
+        return i
+
+    def bits_of(self, lits) -> int:
+        return sum(1 << self.intern(l) for l in sorted(set(lits)))
+
+    def support_of(self, a: int, path: frozenset = frozenset()) -> frozenset:
+        """
+        `a` and, recursively, the sole achiever of each of its preconditions that has only
+        one: the actions a relaxed plan is bound to take along with `a`.
+        """
+        if self.support[a] is None:
+            out = {a}
+            for p in self.pre[a]:
+                if len(self.by_add[p]) == 1 and self.by_add[p][0] not in path:
+                    out |= self.support_of(self.by_add[p][0], path | {a})
+            self.support[a] = frozenset(out)
+        return self.support[a]
+
+    def clashes(self, a: int, b: int) -> bool:
+        """Whether, outside the support they share, one of a and b deletes a precondition of the other."""
+        only_a = self.support[a] - self.support[b]
+        only_b = self.support[b] - self.support[a]
+        return any(self.del_bits[x] & self.pre_bits[y] or self.pre_bits[x] & self.del_bits[y]
+                   for x in only_a for y in only_b)
+
+    def apply(self, state: int, a: int) -> int:
+        return (state & ~self.del_bits[a]) | self.add_bits[a]
+
+    def applicable(self, state: int) -> List[int]:
+        pre = self.pre_bits
+        return [a for a in range(len(pre)) if not pre[a] & ~state]
+
+    def heuristic(self, state: int) -> Tuple[float, List[int]]:
+        """
+        h_FF of a state and its helpful actions. A relaxed planning graph (deletes ignored)
+        is grown with per-action precondition counters; a relaxed plan is then read
+        backwards from the goals and its size is the estimate. Helpful actions are the
+        applicable actions of the relaxed plan, or failing that those adding a literal the
+        plan needs at its first layer.
+
+        Ignoring deletes hides consumed resources: two goals may both be "reached" with the
+        same Free(Ranger1). So each goal, fewest achievers first, takes an achiever that
+        clashes with none already chosen, moving a clashing goal to another achiever when
+        that frees one up (augmenting paths, as in bipartite matching); goals left with only
+        clashing achievers add one each to the estimate.
+        """
+        cached = self.h_cache.get(state)
+        if cached is not None:
+            return cached
+        self.stats['evaluated'] += 1
+        level: Dict[int, int] = {}
+        act_level: Dict[int, int] = {}
+        layer = list(iter_bits(state))
+        for p in layer:
+            level[p] = 0
+        missing = [len(pre) for pre in self.pre]
+        goals_left = sum(1 for g in self.goal_ids if g not in level)
+        ready = list(self.no_pre)
+        k = 0
+        while goals_left and (layer or ready):
+            for p in layer:
+                for a in self.by_pre[p]:
+                    missing[a] -= 1
+                    if not missing[a]:
+                        ready.append(a)
+            layer = []
+            for a in ready:
+                act_level[a] = k
+                for q in self.add[a]:
+                    if q not in level:
+                        level[q] = k + 1
+                        layer.append(q)
+                        if q in self.goal_set:
+                            goals_left -= 1
+            ready = []
+            k += 1
+        if goals_left:
+            result = (INF_COST, [])
+            self.h_cache[state] = result
+            return result
+        # relaxed plan extraction, deepest goals first
+        by_level: Dict[int, Set[int]] = {}
+        for g in self.goal_ids:
+            if level[g]:
+                by_level.setdefault(level[g], set()).add(g)
+        plan: Set[int] = set()
+        owner: Dict[int, int] = {}      # achiever -> the goal it was chosen for; the ones clashes are checked against
+        options: Dict[int, List[int]] = {}
+        wanted: Dict[int, int] = {}     # subgoal -> how many plan actions still need it
+        first_layer = set()
+        clashes = 0
+
+        def cost(a):
+            return sum(level[p] for p in self.pre[a]), a
+
+        def choose(a, g=None):
+            plan.add(a)
+            if g is not None:
+                owner[a] = g
+            for p in self.pre[a]:
+                if level[p]:
+                    by_level.setdefault(level[p], set()).add(p)
+                    wanted[p] = wanted.get(p, 0) + 1
+
+        def drop(b):
+            plan.discard(b)
+            for p in self.pre[b]:
+                if level[p]:
+                    wanted[p] -= 1
+
+        # an achiever of g that clashes with no chosen one, if need be by moving the goal of
+        # its single blocker to another achiever, recursively (an augmenting path)
+        def place(g, seen):
+            for a in sorted(options[g], key=cost):
+                if a in owner:
+                    continue
+                blockers = [b for b in owner if self.clashes(a, b)]
+                if not blockers:
+                    return a
+                if len(blockers) > 1 or owner[blockers[0]] in seen:
+                    continue
+                b = blockers[0]
+                gb = owner.pop(b)
+                seen.add(gb)
+                owner[a] = g
+                alt = place(gb, seen)
+                del owner[a]
+                if alt is not None:
+                    drop(b)
+                    choose(alt, gb)
+                    return a
+                owner[b] = gb
+            return None
+
+        for i in range(max(by_level, default=0), 0, -1):
+            goals = sorted(by_level.get(i, ()))
+            for g in goals:
+                options[g] = [a for a in self.by_add[g] if act_level.get(a, INF_COST) < i]
+            for g in sorted(goals, key=lambda g: len(options[g])):
+                if any(a in plan for a in options[g]) or not (g in self.goal_set or wanted[g]):
+                    continue
+                sole = options[g][0] if len(self.by_add[g]) == 1 else None
+                if sole is not None and any(sole in self.support[b] for b in owner):
+                    choose(sole)        # already part of a chosen achiever's support
+                else:
+                    a = place(g, {g})
+                    if a is None:
+                        clashes += 1
+                        a = min(options[g], key=cost)
+                    choose(a, g)
+                if i == 1:
+                    first_layer.add(g)
+        applicable = self.applicable(state)
+        helpful = ([a for a in applicable if a in plan] or
+                   [a for a in applicable if any(q in first_layer for q in self.add[a])])
+        result = (len(plan) + clashes, helpful)
+        self.h_cache[state] = result
+        return result
+
+    def solve(self, initial: Set[str], goals: Set[str], max_expansions: int = 200000) -> ForwardPlanResult:
+        t0 = time.perf_counter()
+        self.stats = {'evaluated': 0, 'expanded': 0, 'ehc_steps': 0, 'gbfs': 0, 'seconds': 0.0}
+        self.h_cache = {}
+        start = self.bits_of(initial)
+        self.goal_bits = self.bits_of(goals)
+        self.goal_ids = list(iter_bits(self.goal_bits))
+        self.goal_set = set(self.goal_ids)
+        plan = self.enforced_hill_climbing(start, max_expansions)
+        if plan is None:
+            self.stats['gbfs'] = 1
+            plan = self.greedy_best_first(start, max_expansions)
+        self.stats['seconds'] = time.perf_counter() - t0
+        return ForwardPlanResult(None if plan is None else [self.actions[a] for a in plan], dict(self.stats))
+
+    def enforced_hill_climbing(self, state: int, max_expansions: int) -> Optional[List[int]]:
+        plan: List[int] = []
+        h, _ = self.heuristic(state)
+        while state & self.goal_bits != self.goal_bits:
+            if h == INF_COST:
+                return None
+            # breadth-first from the current state until a strictly better one is found
+            parent: Dict[int, Tuple[int, int]] = {state: (-1, -1)}
+            queue = deque([state])
+            better = None
+            while queue and better is None:
+                s = queue.popleft()
+                self.stats['expanded'] += 1
+                if self.stats['expanded'] > max_expansions:
+                    return None
+                for a in self.heuristic(s)[1]:
+                    t = self.apply(s, a)
+                    if t in parent:
+                        continue
+                    parent[t] = (s, a)
+                    ht, _ = self.heuristic(t)
+                    if ht < h:
+                        better, h = t, ht
+                        break
+                    queue.append(t)
+            if better is None:
+                return None
+            steps = []
+            s = better
+            while parent[s][0] != -1:
+                s, a = parent[s]
+                steps.append(a)
+            plan.extend(reversed(steps))
+            state = better
+            self.stats['ehc_steps'] += 1
+        return plan
+
+    def greedy_best_first(self, start: int, max_expansions: int) -> Optional[List[int]]:
+        """
+        Lazy greedy best-first search over all applicable actions: successors are queued
+        under their parent's h and evaluated only when popped. Among equal h, successors
+        reached by a helpful action come first, then the ones fewer steps from the start.
+        """
+        parent: Dict[int, Tuple[int, int]] = {}
+        heap = [(0, False, 0, 0, -1, -1)]
+        tie = itertools.count(1)
+        while heap:
+            _, _, depth, _, s, a = heapq.heappop(heap)
+            t = start if s == -1 else self.apply(s, a)
+            if t in parent:
+                continue
+            parent[t] = (s, a)
+            if t & self.goal_bits == self.goal_bits:
+                plan = []
+                while parent[t][0] != -1:
+                    t, a = parent[t]
+                    plan.append(a)
+                return plan[::-1]
+            h, helpful = self.heuristic(t)
+            if h == INF_COST:
+                continue
+            self.stats['expanded'] += 1
+            if self.stats['expanded'] > max_expansions:
+                return None
+            helpful = set(helpful)
+            for a in self.applicable(t):
+                heapq.heappush(heap, (h, a not in helpful, depth + 1, next(tie), t, a))
+        return None
+
+def parse_literal(lit: str) -> Tuple[bool, str, Tuple[str, ...]]:
+    """'¬Free(?r)' -> (True, 'Free', ('?r',)); spaces around arguments are ignored."""
+    neg = is_neg(lit)
+    body = lit[1:] if neg else lit
+    if "(" not in body:
+        return neg, body.strip(), ()
+    pred, args = body.split("(", 1)
+    return neg, pred.strip(), tuple(a.strip() for a in args.strip()[:-1].split(",") if a.strip())
+
+def format_literal(neg: bool, pred: str, args: Tuple[str, ...]) -> str:
+    lit = f"{pred}({','.join(args)})" if args else pred
+    return negate(lit) if neg else lit
+
+@dataclass(frozen=True)
+class Schema:
+    """
+    Lifted operator, e.g. Assign(?r, ?z) with params=(("?r", "Ranger"), ("?z", "Zone")).
+    Literals are written like ground ones with ?variables in place of objects; arguments
+    without a leading '?' are constants. Ground actions are named like the hand-written
+    ones: Assign_Ranger1_Riverbed.
+    """
+    name: str
+    params: Tuple[Tuple[str, str], ...]
+    pre: Tuple[str, ...]
+    add: Tuple[str, ...]
+    rem: Tuple[str, ...] = ()
+
+@dataclass
+class Grounding:
+    actions: List[Action]
+    initial: Set[str]            # the initial state without static facts
+    static: Set[str]             # initial facts no schema adds or removes
+    stats: Dict[str, float]
+
+class Grounder:
+    """
+    Grounds Schemas over typed objects, keeping only actions reachable from the initial state.
+
+    Predicates that no schema adds or removes are static: their facts are indexed once by
+    (predicate, argument position, object), and they are dropped from the ground actions
+    and from the returned initial state since they hold everywhere. Reachability is the
+    delete-relaxed fixpoint: a schema is instantiated only by joining its positive
+    preconditions against facts already reached, the most constrained precondition first,
+    so groundings whose preconditions can never hold are never built. Parameters that no
+    positive precondition mentions range over every object of their type. A negated static
+    precondition such as ¬Blocked(?z) is checked against the static facts once the binding
+    is complete, and a negated literal in an add list never makes a fact reachable.
+    """
+    def __init__(self, schemas: List[Schema], objects: Dict[str, List[str]], initial: Set[str]):
+        self.schemas = list(schemas)
+        self.objects = {t: list(objs) for t, objs in objects.items()}
+        self.typed = {t: set(objs) for t, objs in objects.items()}
+        self.initial = set(initial)
+        self.fluent_preds = {parse_literal(lit)[1] for s in self.schemas for lit in s.add + s.rem}
+        self.facts: Set[Tuple[str, Tuple[str, ...]]] = set()
+        self.by_pred: Dict[str, List[Tuple[str, ...]]] = {}
+        self.index: Dict[Tuple[str, int, str], List[Tuple[str, ...]]] = {}
+        for lit in sorted(self.initial):      # so the action order does not depend on the hash seed
+            neg, pred, args = parse_literal(lit)
+            if not neg:
+                self.add_fact(pred, args)
+
+    def is_static(self, pred: str) -> bool:
+        return pred not in self.fluent_preds
+
+    def add_fact(self, pred: str, args: Tuple[str, ...]) -> bool:
+        if (pred, args) in self.facts:
+            return False
+        self.facts.add((pred, args))
+        self.by_pred.setdefault(pred, []).append(args)
+        for i, obj in enumerate(args):
+            self.index.setdefault((pred, i, obj), []).append(args)
+        return True
+
+    def candidates(self, pred: str, args: Tuple[str, ...], binding: Dict[str, str]) -> List[Tuple[str, ...]]:
+        """Reached facts of `pred` matching the bound arguments, via the smallest index list."""
+        best = self.by_pred.get(pred, [])
+        for i, a in enumerate(args):
+            obj = binding.get(a) if a.startswith("?") else a
+            if obj is not None:
+                facts = self.index.get((pred, i, obj), [])
+                if len(facts) < len(best):
+                    best = facts
+        return best
+
+    def unify(self, args: Tuple[str, ...], fact: Tuple[str, ...], binding: Dict[str, str],
+              types: Dict[str, str]) -> Optional[Dict[str, str]]:
+        if len(args) != len(fact):
+            return None
+        new = None
+        for a, obj in zip(args, fact):
+            if not a.startswith("?"):
+                if a != obj:
+                    return None
+                continue
+            bound = (new or binding).get(a)
+            if bound is None:
+                if obj not in self.typed.get(types[a], ()):
+                    return None
+                new = dict(new or binding)
+                new[a] = obj
+            elif bound != obj:
+                return None
+        return new or binding
+
+    def bindings(self, conds: List[Tuple[str, Tuple[str, ...]]], binding: Dict[str, str], types: Dict[str, str]):
+        if not conds:
+            yield binding
+            return
+        best = None
+        for k, (pred, args) in enumerate(conds):
+            facts = self.candidates(pred, args, binding)
+            if best is None or len(facts) < len(best[1]):
+                best = (k, facts)
+                if not facts:
+                    return
+        k, facts = best
+        pred, args = conds[k]
+        rest = conds[:k] + conds[k + 1:]
+        for fact in list(facts):
+            b = self.unify(args, fact, binding, types)
+            if b is not None:
+                yield from self.bindings(rest, b, types)
+
+    def instantiate(self, schema: Schema, binding: Dict[str, str]) -> Action:
+        def sub(lits, keep_static=True):
+            out = []
+            for lit in lits:
+                neg, pred, args = parse_literal(lit)
+                if keep_static or not self.is_static(pred):
+                    out.append(format_literal(neg, pred, tuple(binding.get(a, a) for a in args)))
+            return tuple(out)
+        name = "_".join([schema.name] + [binding[v] for v, _ in schema.params])
+        return Action(name, pre=sub(schema.pre, keep_static=False), add=sub(schema.add), rem=sub(schema.rem))
+
+    def ground(self) -> Grounding:
+        t0 = time.perf_counter()
+        compiled = []
+        for s in self.schemas:
+            types = dict(s.params)
+            conds, banned = [], []
+            for lit in s.pre:
+                neg, pred, args = parse_literal(lit)
+                if not neg:
+                    conds.append((pred, args))
+                elif self.is_static(pred):
+                    banned.append((pred, args))
+            mentioned = {a for _, args in conds for a in args}
+            free = [(v, t) for v, t in s.params if v not in mentioned]
+            compiled.append((s, types, conds, banned, free))
+        actions: Dict[str, Action] = {}
+        rounds = tried = 0
+        changed = True
+        while changed:
+            changed = False
+            rounds += 1
+            new_facts = []
+            for s, types, conds, banned, free in compiled:
+                for binding in self.bindings(conds, {}, types):
+                    for objs in itertools.product(*(self.objects.get(t, []) for _, t in free)):
+                        tried += 1
+                        b = dict(binding, **{v: o for (v, _), o in zip(free, objs)}) if free else binding
+                        # static facts never change, so a negated one that holds initially rules the grounding out
+                        if any((pred, tuple(b.get(x, x) for x in args)) in self.facts for pred, args in banned):
+                            continue
+                        a = self.instantiate(s, b)
+                        if a.name in actions:
+                            continue
+                        actions[a.name] = a
+                        new_facts.extend((pred, args) for neg, pred, args in map(parse_literal, a.add) if not neg)
+            for pred, args in new_facts:
+                changed |= self.add_fact(pred, args)
+        static = {lit for lit in self.initial if not is_neg(lit) and self.is_static(parse_literal(lit)[1])}
+        stats = {'schemas': len(self.schemas), 'actions': len(actions), 'rounds': rounds, 'bindings': tried,
+                 'facts': len(self.facts), 'static_facts': len(static), 'seconds': time.perf_counter() - t0}
+        return Grounding(list(actions.values()), self.initial - static, static, stats)
+
+def ground(schemas: List[Schema], objects: Dict[str, List[str]], initial: Set[str]) -> Grounding:
+    return Grounder(schemas, objects, initial).ground()
+
+def pop_literal(lit: str) -> str:
+    """'¬Free(Ranger1)' in the POP planners' notation, 'NOT(Free(Ranger1))'; positive literals are unchanged."""
+    return f"NOT({negate(lit)})" if is_neg(lit) else lit
+
+def pop_operators(actions: List[Action]) -> Dict[str, Dict[str, Set[str]]]:
+    """Ground actions in the operator layout of create_wildlife_problem(), for the POP planners."""
+    return {a.name: {'preconditions': {pop_literal(p) for p in a.pre},
+                     'effects': set(a.add) | {pop_literal(r) for r in a.rem}} for a in actions}
+
+WILDLIFE_SCHEMAS: List[Schema] = [
+    Schema("Analyze", (("?a", "Alert"), ("?z", "Zone")),
+           pre=("Alert(?a)", "AlertAt(?a,?z)"),
+           add=("RiskAssessed(?z)", "AlertCleared(?a)"), rem=("¬Alert(?a)",)),
+    Schema("Assign", (("?r", "Ranger"), ("?z", "Zone")),
+           pre=("RiskAssessed(?z)", "Free(?r)", "Covers(?r,?z)"),
+           add=("Assigned(?r,?z)", "Engaged(?r)"), rem=("¬Free(?r)",)),
+    Schema("Dispatch", (("?r", "Ranger"), ("?z", "Zone")),
+           pre=("Assigned(?r,?z)",), add=("Patrolled(?z)",)),
+    Schema("Monitor", (("?d", "Drone"), ("?z", "Zone")),
+           pre=("RiskAssessed(?z)", "Free(?d)", "InRange(?d,?z)"),
+           add=("SurveillanceActive(?z)", "Engaged(?d)"), rem=("¬Free(?d)",)),
+]
+
 def visualize_graphplan_clean(pg, filename="graphplan_clean"):
     """Generate a clear, layered GraphPlan visualization using Graphviz"""
+    from graphviz import Digraph
     dot = Digraph(comment="GraphPlan - Wildlife Poaching Prevention")
     dot.attr(rankdir='LR', fontsize='12', nodesep='0.6', ranksep='1.0')
     color_state = "#E6F2FF"
@@ -567,6 +1812,103 @@ Rounded Rect → Action
     print(f"Clear GraphPlan saved as {filename}.png")
     return dot
 
-graph = visualize_graphplan_clean(pg, "wildlife_graphplan_clear")
-display(graph)
-graph.render("wildlife_pop_graph", format="png", cleanup=True)
\ No newline at end of file
+def graphplan_demo(render: bool = True):
+    pg = PlanningGraph(domain_actions, S0)
+    reachable = pg.build_until(GOALS, max_levels=8)
+    plan = extract_plan(pg, GOALS)
+
+    print("Goals reachable:", reachable)
+    print("\n--- Extracted Plan (GraphPlan) ---")
+    if plan:
+        for i, a in enumerate(plan, 1):
+            print(f"{i}. {a.name}  Pre={list(a.pre)}  Add={list(a.add)}")
+    else:
+        print("No plan found.")
+    if render:
+        show(visualize_graphplan_clean(pg, "wildlife_graphplan_clear"))
+    return plan
+
+PLANNERS = ('graphplan', 'ff', 'pop')
+IMPORT_BUDGET = 0.1     # seconds for a cold `import module3`, measured in a fresh interpreter
+
+def solve_problem(problem: Dict, planner: str = 'ff') -> Dict:
+    """
+    Ground and plan one batch problem: {"name", "objects", "initial", "goals"} over
+    WILDLIFE_SCHEMAS, or {"name", "actions", "initial", "goals"} with ground actions as
+    {"name", "pre", "add", "rem"} objects. Returns a JSON-ready record.
+    """
+    t0 = time.perf_counter()
+    goals = set(problem['goals'])
+    if 'actions' in problem:
+        actions = [Action(a['name'], tuple(a.get('pre', ())), tuple(a.get('add', ())), tuple(a.get('rem', ())))
+                   for a in problem['actions']]
+        initial = set(problem['initial'])
+    else:
+        g = ground(WILDLIFE_SCHEMAS, problem['objects'], set(problem['initial']))
+        actions, initial = g.actions, g.initial
+    t_ground = time.perf_counter() - t0
+    if planner == 'graphplan':
+        res = graphplan(actions, initial, goals)
+        steps = [a.name for a in res.actions()] if res.plan is not None else None
+    elif planner == 'ff':
+        res = FFPlanner(actions).solve(initial, goals)
+        steps = [a.name for a in res.plan] if res.plan is not None else None
+    elif planner == 'pop':
+        solution = SearchPartialOrderPlanner(pop_operators(actions), {pop_literal(x) for x in initial},
+                                             {pop_literal(g) for g in goals}).solve()
+        steps = [n for n in solution['order'] if n not in ('Start', 'Finish')] if solution else None
+    else:
+        raise ValueError(f"unknown planner {planner!r}, expected one of {PLANNERS}")
+    return {'name': problem.get('name'), 'planner': planner, 'solved': steps is not None, 'plan': steps,
+            'ground_actions': len(actions), 'ground_seconds': t_ground, 'seconds': time.perf_counter() - t0}
+
+def measure_import_time(runs: int = 5) -> float:
+    """
+    Best-of-`runs` wall time of `import module3` in a fresh interpreter, in seconds. A first
+    run writes the bytecode cache, as a deployed worker would have it, and is not counted.
+    """
+    import os
+    import subprocess
+    import sys
+    code = "import time; t = time.perf_counter(); import module3; print(time.perf_counter() - t)"
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    times = [float(subprocess.run([sys.executable, "-c", code], cwd=here, env=env, check=True,
+                                  capture_output=True, text=True).stdout) for _ in range(runs + 1)]
+    return min(times[1:])
+
+def main(argv=None):
+    import argparse
+    import json
+    import sys
+    ap = argparse.ArgumentParser(description="Module 3 patrol planners: the POP and GraphPlan demos, "
+                                             "or a batch of problems from a JSON file.")
+    ap.add_argument('--batch', help="JSON list of problems (see solve_problem); one JSON record per line is written")
+    ap.add_argument('--planner', choices=PLANNERS, default='ff', help="planner for --batch (default: ff)")
+    ap.add_argument('--out', help="write --batch records to this file instead of stdout")
+    ap.add_argument('--no-render', action='store_true', help="demos only: skip the Graphviz PNGs")
+    ap.add_argument('--import-time', action='store_true',
+                    help=f"measure the cold import time and fail if it exceeds {IMPORT_BUDGET * 1e3:.0f} ms")
+    args = ap.parse_args(argv)
+    if args.import_time:
+        t = measure_import_time()
+        print(f"cold import: {t * 1e3:.1f} ms (budget {IMPORT_BUDGET * 1e3:.0f} ms)")
+        return 0 if t <= IMPORT_BUDGET else 1
+    if args.batch:
+        with open(args.batch) as f:
+            problems = json.load(f)
+        out = open(args.out, 'w') if args.out else sys.stdout
+        try:
+            for problem in problems:
+                out.write(json.dumps(solve_problem(problem, args.planner)) + "\n")
+        finally:
+            if args.out:
+                out.close()
+        return 0
+    pop_demo(render=not args.no_render)
+    print()
+    graphplan_demo(render=not args.no_render)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
\ No newline at end of file
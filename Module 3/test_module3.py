@@ -0,0 +1,372 @@
+"""Checks of the Module 3 planners against breadth-first search on small random problems.
+
+Run from the Module 3 folder: python -m pytest -q test_module3.py
+"""
+import itertools
+import random
+from collections import deque
+
+import bench
+import module3 as m3
+
+
+# ---------------------------------------------------------------- POP layout helpers
+
+def pop_holds(state, cond):
+    return cond[4:-1] not in state if cond.startswith('NOT(') else cond in state
+
+
+def pop_apply(state, effects):
+    state = set(state)
+    for e in effects:
+        if e.startswith('NOT('):
+            state.discard(e[4:-1])
+        else:
+            state.add(e)
+    return state
+
+
+def pop_bfs(operators, initial, goals) -> bool:
+    """Whether any sequence of operators reaches the goals."""
+    start = frozenset(initial)
+    seen, queue = {start}, deque([start])
+    while queue:
+        s = queue.popleft()
+        if all(pop_holds(s, g) for g in goals):
+            return True
+        for op in operators.values():
+            if all(pop_holds(s, c) for c in op['preconditions']):
+                t = frozenset(pop_apply(s, op['effects']))
+                if t not in seen:
+                    seen.add(t)
+                    queue.append(t)
+    return False
+
+
+def pop_valid(plan, initial, goals, order) -> bool:
+    state = set(initial)
+    for name in order:
+        if name in ('Start', 'Finish'):
+            continue
+        op = plan['steps'][name]
+        if not all(pop_holds(state, c) for c in op['preconditions']):
+            return False
+        state = pop_apply(state, op['effects'])
+    return all(pop_holds(state, g) for g in goals)
+
+
+def random_linearization(plan, rng):
+    succ = {n: set() for n in plan['steps']}
+    indeg = {n: 0 for n in plan['steps']}
+    for a, b in plan['orderings']:
+        if b not in succ[a]:
+            succ[a].add(b)
+            indeg[b] += 1
+    ready = [n for n, d in indeg.items() if d == 0]
+    order = []
+    while ready:
+        n = ready.pop(rng.randrange(len(ready)))
+        order.append(n)
+        for m in succ[n]:
+            indeg[m] -= 1
+            if not indeg[m]:
+                ready.append(m)
+    return order
+
+
+def random_pop_problem(rng):
+    """3-6 literals, 2-7 operators; no operator or goal set contradicts itself."""
+    lits = [f"P{i}" for i in range(rng.randint(3, 6))]
+
+    def lit():
+        return rng.choice(lits) if rng.random() < 0.75 else f"NOT({rng.choice(lits)})"
+    while True:
+        ops = {f"o{i}": {'preconditions': {lit() for _ in range(rng.randint(0, 2))},
+                         'effects': {lit() for _ in range(rng.randint(1, 2))}} for i in range(rng.randint(2, 7))}
+        goals = {lit() for _ in range(rng.randint(1, 3))}
+        if any(m3.pop_negate(e) in op['effects'] for op in ops.values() for e in op['effects']):
+            continue
+        if any(m3.pop_negate(g) in goals for g in goals):
+            continue
+        return ops, set(rng.sample(lits, rng.randint(1, 3))), goals
+
+
+# ---------------------------------------------------------------- SearchPartialOrderPlanner
+
+def test_search_pop_demo_plan_is_valid():
+    ops, initial, goals = m3.create_wildlife_problem()
+    plan = m3.SearchPartialOrderPlanner(ops, initial, goals).solve()
+    assert plan is not None
+    assert pop_valid(plan, initial, goals, plan['order'])
+
+
+def test_search_pop_matches_bfs_on_random_problems():
+    rng = random.Random(7)
+    solved = unsolvable = 0
+    for _ in range(300):
+        ops, initial, goals = random_pop_problem(rng)
+        planner = m3.SearchPartialOrderPlanner(ops, initial, goals)
+        plan = planner.solve(time_limit=10)
+        if pop_bfs(ops, initial, goals):
+            assert plan is not None, (ops, initial, goals)
+            for _ in range(3):      # every linearization of the partial order must work
+                assert pop_valid(plan, initial, goals, random_linearization(plan, rng))
+            solved += 1
+        else:
+            assert plan is None
+            assert planner.stats['stopped'] in ('unreachable', 'exhausted')
+            unsolvable += 1
+    assert solved and unsolvable
+
+
+def test_search_pop_unreachable_goal_returns_at_once():
+    # NOT(P4) is only added by o2, which needs it: unreachable even with deletes ignored
+    ops = {f"o{i}": {'preconditions': {f"P{i % 3}"}, 'effects': {f"P{(i + 1) % 3}"}} for i in range(8) if i != 2}
+    ops['o2'] = {'preconditions': {'NOT(P4)'}, 'effects': {'NOT(P4)', 'P2'}}
+    planner = m3.SearchPartialOrderPlanner(ops, {'P4', 'P0', 'P5'}, {'NOT(P4)', 'P2'})
+    assert planner.solve() is None
+    assert planner.stats['stopped'] == 'unreachable'
+    assert planner.stats['nodes'] == 0
+
+
+def test_search_pop_cyclic_achievers_terminate():
+    # Grab and Lock each use up the Key; Copy needs a Key to make one, so every Copy regresses Key again
+    ops = {'Grab': {'preconditions': {'Key'}, 'effects': {'Door', 'NOT(Key)'}},
+           'Lock': {'preconditions': {'Key'}, 'effects': {'Safe', 'NOT(Key)'}},
+           'Copy': {'preconditions': {'Key', 'Blank'}, 'effects': {'Key', 'NOT(Blank)'}}}
+    planner = m3.SearchPartialOrderPlanner(ops, {'Key', 'Blank'}, {'Door', 'Safe'})
+    assert planner.solve() is None
+    assert planner.stats['stopped'] == 'exhausted'
+    assert not pop_bfs(ops, {'Key', 'Blank'}, {'Door', 'Safe'})
+
+
+def test_search_pop_limits_stop_the_search():
+    ops = {f"Step{i}": {'preconditions': {f"S{i}"}, 'effects': {f"S{i + 1}"}} for i in range(30)}
+    planner = m3.SearchPartialOrderPlanner(ops, {'S0'}, {'S30'})
+    assert planner.solve(max_steps=10) is None
+    assert planner.stats['stopped'] == 'exhausted'
+    assert planner.solve(max_nodes=5) is None
+    assert planner.stats['stopped'] == 'max_nodes'
+    assert planner.solve(time_limit=0) is None
+    assert planner.stats['stopped'] == 'time_limit'
+    plan = planner.solve()
+    assert plan is not None and len(plan['steps']) == 32
+
+
+# ---------------------------------------------------------------- Grounder
+
+def brute_force_ground(schemas, objects, initial):
+    """Names of every typed grounding whose preconditions are reachable with deletes ignored."""
+    fluent = {m3.parse_literal(lit)[1] for s in schemas for lit in s.add + s.rem}
+    reached = {lit for lit in initial if not m3.is_neg(lit)}
+    candidates = []
+    for s in schemas:
+        for objs in itertools.product(*(objects[t] for _, t in s.params)):
+            b = dict(zip((v for v, _ in s.params), objs))
+            pre = [m3.parse_literal(lit) for lit in s.pre]
+            lits = [(neg, m3.format_literal(False, pred, tuple(b.get(a, a) for a in args)), pred in fluent)
+                    for neg, pred, args in pre]
+            if any(neg and not is_fluent and lit in initial for neg, lit, is_fluent in lits):
+                continue
+            adds = [m3.format_literal(neg, pred, tuple(b.get(a, a) for a in args))
+                    for neg, pred, args in map(m3.parse_literal, s.add)]
+            candidates.append(("_".join([s.name, *objs]), [lit for neg, lit, _ in lits if not neg], adds))
+    names, changed = set(), True
+    while changed:
+        changed = False
+        for name, pre, adds in candidates:
+            if name not in names and all(p in reached for p in pre):
+                names.add(name)
+                reached |= {a for a in adds if not m3.is_neg(a)}
+                changed = True
+    return names
+
+
+def test_grounder_matches_brute_force_on_wildlife_problems():
+    for seed in range(3):
+        zones = [f"Zone{i}" for i in range(6)]
+        rng = random.Random(seed)
+        objects = {'Zone': zones, 'Ranger': ['Ranger1', 'Ranger2'], 'Drone': ['Drone1'],
+                   'Alert': ['Gunshot0', 'Intel1', 'Thermal2']}
+        initial = {'Free(Ranger1)', 'Free(Ranger2)', 'Free(Drone1)'}
+        for a in objects['Alert']:
+            initial |= {f"Alert({a})", f"AlertAt({a},{rng.choice(zones)})"}
+        initial |= {f"Covers(Ranger{i},{z})" for i in (1, 2) for z in rng.sample(zones, 3)}
+        initial |= {f"InRange(Drone1,{z})" for z in rng.sample(zones, 4)}
+        g = m3.ground(m3.WILDLIFE_SCHEMAS, objects, initial)
+        assert {a.name for a in g.actions} == brute_force_ground(m3.WILDLIFE_SCHEMAS, objects, initial)
+
+
+def test_grounder_checks_negated_static_preconditions():
+    schemas = [m3.Schema("Patrol", (("?r", "Ranger"), ("?z", "Zone")),
+                         pre=("Free(?r)", "¬Blocked(?z)"), add=("Patrolled(?z)",), rem=("¬Free(?r)",))]
+    g = m3.ground(schemas, {'Ranger': ['R1'], 'Zone': ['A', 'B']}, {'Free(R1)', 'Blocked(B)'})
+    assert [a.name for a in g.actions] == ['Patrol_R1_A']
+    assert g.actions[0].pre == ('Free(R1)',)
+
+
+def test_grounder_negated_add_does_not_reach_the_fact():
+    # Retire adds ¬Free(?r); that must not make Free(R2) reachable for Patrol
+    schemas = [m3.Schema("Retire", (("?r", "Ranger"),), pre=("Tired(?r)",), add=("¬Free(?r)",)),
+               m3.Schema("Patrol", (("?r", "Ranger"),), pre=("Free(?r)",), add=("Patrolled(?r)",))]
+    g = m3.ground(schemas, {'Ranger': ['R1', 'R2']}, {'Free(R1)', 'Tired(R2)'})
+    assert sorted(a.name for a in g.actions) == ['Patrol_R1', 'Retire_R2']
+
+
+# ---------------------------------------------------------------- ground Action layout helpers
+
+def ground_apply(state, a):
+    """Positive literals after `a`: every rem ¬X deletes X, then the add list is added."""
+    return (state - {m3.negate(r) for r in a.rem}) | set(a.add)
+
+
+def ground_bfs(actions, initial, goals):
+    """Length of a shortest sequential plan, or None when there is none."""
+    start = frozenset(initial)
+    seen, queue = {start: 0}, deque([start])
+    while queue:
+        s = queue.popleft()
+        if goals <= s:
+            return seen[s]
+        for a in actions:
+            if set(a.pre) <= s:
+                t = frozenset(ground_apply(s, a))
+                if t not in seen:
+                    seen[t] = seen[s] + 1
+                    queue.append(t)
+    return None
+
+
+def ground_valid(steps, initial, goals) -> bool:
+    state = set(initial)
+    for a in steps:
+        if not set(a.pre) <= state:
+            return False
+        state = ground_apply(state, a)
+    return goals <= state
+
+
+def random_ground_problem(rng):
+    """4-7 literals, 2-8 actions with positive preconditions and goals; no action adds what it removes."""
+    lits = [f"P{i}" for i in range(rng.randint(4, 7))]
+    actions = []
+    for i in range(rng.randint(2, 8)):
+        pre = rng.sample(lits, rng.randint(0, 2))
+        add = rng.sample(lits, rng.randint(1, 2))
+        rem = [m3.negate(x) for x in rng.sample(lits, rng.randint(0, 2)) if x not in add]
+        actions.append(m3.Action(f"a{i}", pre=tuple(pre), add=tuple(add), rem=tuple(rem)))
+    return actions, set(rng.sample(lits, rng.randint(1, 3))), set(rng.sample(lits, rng.randint(1, 3)))
+
+
+# ---------------------------------------------------------------- FFPlanner
+
+def test_ff_matches_bfs_on_random_problems():
+    rng = random.Random(11)
+    solved = unsolvable = 0
+    for _ in range(300):
+        actions, initial, goals = random_ground_problem(rng)
+        res = m3.FFPlanner(actions).solve(initial, goals)
+        if ground_bfs(actions, initial, goals) is None:
+            assert res.plan is None, (actions, initial, goals)
+            unsolvable += 1
+        else:
+            assert res.plan is not None, (actions, initial, goals)
+            assert ground_valid(res.plan, initial, goals)
+            solved += 1
+    assert solved and unsolvable
+
+
+def test_ff_demo_and_dead_end():
+    res = m3.FFPlanner(m3.domain_actions).solve(m3.S0, m3.GOALS)
+    assert ground_valid(res.plan, m3.S0, m3.GOALS)
+    # Burn uses up the only Fuel that Bake needs: hill-climbing must not commit to it
+    actions = [m3.Action("Burn", pre=("Fuel",), add=("Warm",), rem=("¬Fuel",)),
+               m3.Action("Bake", pre=("Fuel", "Warm"), add=("Bread",), rem=()),
+               m3.Action("Light", pre=(), add=("Warm",), rem=())]
+    res = m3.FFPlanner(actions).solve({"Fuel"}, {"Bread"})
+    assert [a.name for a in res.plan] == ["Light", "Bake"]
+
+
+def test_ff_unsolvable_returns_none():
+    actions = [m3.Action("Burn", pre=("Fuel",), add=("Warm",), rem=("¬Fuel",)),
+               m3.Action("Bake", pre=("Fuel", "Warm"), add=("Bread",), rem=())]
+    res = m3.FFPlanner(actions).solve({"Fuel"}, {"Bread"})
+    assert res.plan is None
+    assert res.stats['gbfs'] == 1
+    assert m3.FFPlanner(actions).solve({"Fuel"}, {"Cake"}).plan is None
+
+
+# ---------------------------------------------------------------- GraphPlanSearch / IncrementalPlanningGraph
+
+def assert_graphplan_agrees(res, actions, initial, goals, rng):
+    length = ground_bfs(actions, initial, goals)
+    if length is None:
+        assert res.plan is None, (actions, initial, goals)
+        return False
+    assert res.plan is not None, (actions, initial, goals)
+    assert res.levels <= length     # a sequential plan is a layered one with one action per level
+    for _ in range(3):              # actions of one level are pairwise non-mutex, so any order works
+        steps = [a for level in res.plan for a in rng.sample(level, len(level)) if not a.name.startswith("NOOP_")]
+        assert ground_valid(steps, initial, goals)
+    return True
+
+
+def test_graphplan_matches_bfs_on_random_problems():
+    rng = random.Random(5)
+    outcomes = set()
+    for _ in range(300):
+        actions, initial, goals = random_ground_problem(rng)
+        outcomes.add(assert_graphplan_agrees(m3.graphplan(actions, initial, goals), actions, initial, goals, rng))
+    assert outcomes == {True, False}
+
+
+def test_graphplan_demo_plan_is_valid():
+    res = m3.graphplan(m3.domain_actions, m3.S0, m3.GOALS)
+    assert ground_valid(res.actions(), m3.S0, m3.GOALS)
+    assert res.levels == 3
+
+
+def graph_levels(pg):
+    return ([set(s) for s in pg.S_levels], [{a.name for a in A} for A in pg.A_levels],
+            [set(m) for m in pg.S_mutex], [set(m) for m in pg.A_mutex])
+
+
+def test_incremental_graph_update_matches_fresh_graph():
+    rng = random.Random(3)
+    for _ in range(100):
+        actions, initial, goals = random_ground_problem(rng)
+        lits = sorted({x for a in actions for x in a.pre + a.add} | initial)
+        pg = m3.IncrementalPlanningGraph(actions, initial)
+        pg.plan(goals)
+        state = set(initial)
+        for _ in range(3):
+            add = set(rng.sample(lits, 1))
+            remove = set(rng.sample(sorted(state), 1)) - add if state and rng.random() < 0.7 else set()
+            pg.update(add, remove)
+            state = (state | add) - remove
+            fresh = m3.IncrementalPlanningGraph(actions, state)
+            while len(fresh.S_bits) < len(pg.S_bits):
+                fresh.expand()
+            assert graph_levels(pg) == graph_levels(fresh)
+            assert_graphplan_agrees(pg.plan(goals), actions, state, goals, rng)
+
+
+# ---------------------------------------------------------------- bench.wildlife_problem
+
+def test_planners_on_wildlife_problems():
+    for p in (bench.wildlife_problem(5, 3, 2, 1, seed=0), bench.wildlife_problem(6, 4, 3, 1, seed=1)):
+        ff = m3.FFPlanner(p.actions).solve(p.initial, p.goals)
+        assert ground_valid(ff.plan, p.initial, p.goals)
+        gp = m3.graphplan(p.actions, p.initial, p.goals)
+        assert ground_valid(gp.actions(), p.initial, p.goals)
+        plan = m3.SearchPartialOrderPlanner(p.operators, p.pop_initial, p.pop_goals).solve()
+        assert pop_valid(plan, p.pop_initial, p.pop_goals, plan['order'])
+
+
+def test_planners_on_unsolvable_wildlife_problem():
+    # two alerts need rangers but there is only one, and Free(Ranger1) never comes back
+    p = bench.wildlife_problem(4, 2, 1, 0, seed=0)
+    assert ground_bfs(p.actions, p.initial, p.goals) is None
+    assert m3.FFPlanner(p.actions).solve(p.initial, p.goals).plan is None
+    assert m3.graphplan(p.actions, p.initial, p.goals).plan is None
+    assert m3.SearchPartialOrderPlanner(p.operators, p.pop_initial, p.pop_goals).solve() is None